@@ -0,0 +1,168 @@
+import os
+import json
+import math
+import time
+import hashlib
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, List, FrozenSet
+
+class QueueFullError(Exception):
+    """Raised when a request cannot be admitted; carries a retry hint in seconds."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+@dataclass
+class AdmissionConfig:
+    max_concurrency: int = 4
+    per_client_concurrency: int = 2
+    max_queue_per_client: int = 10
+    max_queue_total: int = 100
+    max_wait: float = 300.0
+    default_weight: float = 1.0
+    weights: Dict[str, float] = field(default_factory=dict)
+    api_keys: FrozenSet[str] = frozenset()
+
+    @classmethod
+    def from_env(cls) -> "AdmissionConfig":
+        """Reads limits from DOCE_* environment variables, falling back to the defaults."""
+        defaults = cls()
+        weights = os.getenv("DOCE_CLIENT_WEIGHTS")
+        api_keys = os.getenv("DOCE_API_KEYS", "")
+        return cls(
+            max_concurrency=int(os.getenv("DOCE_MAX_CONCURRENCY", defaults.max_concurrency)),
+            per_client_concurrency=int(os.getenv("DOCE_PER_CLIENT_CONCURRENCY", defaults.per_client_concurrency)),
+            max_queue_per_client=int(os.getenv("DOCE_MAX_QUEUE_PER_CLIENT", defaults.max_queue_per_client)),
+            max_queue_total=int(os.getenv("DOCE_MAX_QUEUE_TOTAL", defaults.max_queue_total)),
+            max_wait=float(os.getenv("DOCE_MAX_QUEUE_WAIT", defaults.max_wait)),
+            weights={key: float(value) for key, value in json.loads(weights).items()} if weights else {},
+            api_keys=frozenset(key.strip() for key in api_keys.split(",") if key.strip())
+        )
+
+class _Ticket:
+    __slots__ = ("client_id", "start_tag", "finish_tag", "granted", "admitted_at")
+
+    def __init__(self, client_id: str, start_tag: float, finish_tag: float):
+        self.client_id = client_id
+        self.start_tag = start_tag
+        self.finish_tag = finish_tag
+        self.granted = False
+        self.admitted_at = None
+
+def client_label(client_id: str) -> str:
+    """Returns a short, non-reversible label for a client id (API keys must not leak into stats)."""
+    return hashlib.sha256(client_id.encode("utf-8")).hexdigest()[:12]
+
+class FairAdmission:
+    """Admission control with weighted fair queueing and per-client concurrency limits.
+
+    Waiting requests are ordered by start-time fair queueing tags, so a client
+    with many queued jobs cannot push other clients' requests back, and each
+    client may hold at most per_client_concurrency of the global slots.
+    """
+
+    def __init__(self, config: AdmissionConfig = None):
+        self.config = config or AdmissionConfig()
+        self._condition = threading.Condition()
+        self._waiting: List[_Ticket] = []
+        self._active: Dict[str, int] = {}
+        self._last_finish: Dict[str, float] = {}
+        self._virtual_time = 0.0
+        self._running = 0
+        self._service_time = 1.0  # moving average of seconds a request holds a slot
+        self._rejected = 0
+
+    def _weight(self, client_id: str) -> float:
+        return max(self.config.weights.get(client_id, self.config.default_weight), 1e-6)
+
+    def is_known_key(self, api_key: str) -> bool:
+        return api_key in self.config.api_keys
+
+    def _forget_if_idle(self, client_id: str):
+        """Drops the finish tag of a client with nothing running or queued, so unused ids do not pile up."""
+        if client_id not in self._active and not any(t.client_id == client_id for t in self._waiting):
+            self._last_finish.pop(client_id, None)
+
+    def _retry_after(self, queued_ahead: int) -> float:
+        waves = queued_ahead / max(self.config.max_concurrency, 1) + 1
+        return max(1.0, math.ceil(waves * self._service_time))
+
+    def _grant(self):
+        """Hands free slots to the eligible waiting tickets with the smallest finish tags."""
+        while self._running < self.config.max_concurrency:
+            eligible = [
+                ticket for ticket in self._waiting
+                if self._active.get(ticket.client_id, 0) < self.config.per_client_concurrency
+            ]
+            if not eligible:
+                return
+            ticket = min(eligible, key=lambda t: t.finish_tag)
+            self._waiting.remove(ticket)
+            ticket.granted = True
+            ticket.admitted_at = time.monotonic()
+            self._virtual_time = max(self._virtual_time, ticket.start_tag)
+            self._active[ticket.client_id] = self._active.get(ticket.client_id, 0) + 1
+            self._running += 1
+            self._condition.notify_all()
+
+    def acquire(self, client_id: str, cost: float = 1.0) -> _Ticket:
+        with self._condition:
+            queued = sum(1 for ticket in self._waiting if ticket.client_id == client_id)
+            if queued >= self.config.max_queue_per_client or len(self._waiting) >= self.config.max_queue_total:
+                self._rejected += 1
+                raise QueueFullError("Too many queued requests", self._retry_after(len(self._waiting)))
+
+            start_tag = max(self._virtual_time, self._last_finish.get(client_id, 0.0))
+            ticket = _Ticket(client_id, start_tag, start_tag + cost / self._weight(client_id))
+            self._last_finish[client_id] = ticket.finish_tag
+            self._waiting.append(ticket)
+            self._grant()
+
+            deadline = time.monotonic() + self.config.max_wait
+            while not ticket.granted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._waiting.remove(ticket)
+                    self._rejected += 1
+                    self._forget_if_idle(client_id)
+                    raise QueueFullError("Timed out waiting in queue", self._retry_after(len(self._waiting)))
+                self._condition.wait(timeout=remaining)
+            return ticket
+
+    def release(self, ticket: _Ticket):
+        with self._condition:
+            self._running -= 1
+            self._active[ticket.client_id] -= 1
+            if not self._active[ticket.client_id]:
+                del self._active[ticket.client_id]
+                self._forget_if_idle(ticket.client_id)
+            elapsed = time.monotonic() - ticket.admitted_at
+            self._service_time = 0.8 * self._service_time + 0.2 * elapsed
+            self._grant()
+
+    @contextmanager
+    def slot(self, client_id: str, cost: float = 1.0):
+        ticket = self.acquire(client_id, cost)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def stats(self) -> dict:
+        with self._condition:
+            queued: Dict[str, int] = {}
+            for ticket in self._waiting:
+                label = client_label(ticket.client_id)
+                queued[label] = queued.get(label, 0) + 1
+            return {
+                "running": self._running,
+                "queued": len(self._waiting),
+                "rejected": self._rejected,
+                "average_service_seconds": round(self._service_time, 3),
+                "active_by_client": {client_label(c): n for c, n in self._active.items()},
+                "queued_by_client": queued,
+                "tracked_clients": len(self._last_finish)
+            }
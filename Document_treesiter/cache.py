@@ -0,0 +1,257 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional, Any, Dict
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    redis = None
+    REDIS_AVAILABLE = False
+
+DEFAULT_CACHE_URL = os.getenv("DOCE_CACHE_URL", "sqlite:///.doce_cache.sqlite3")
+
+class CacheMetrics:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def record(self, field: str, count: int = 1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + count)
+
+    def to_dict(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "sets": self.sets,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+class LRUCache:
+    """Thread-safe in-process LRU cache."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.metrics = CacheMetrics()
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            if key not in self._entries:
+                self.metrics.record("misses")
+                return None
+            self._entries.move_to_end(key)
+            self.metrics.record("hits")
+            return self._entries[key]
+
+    def set(self, key: str, value: Any):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            self.metrics.record("sets")
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.metrics.record("evictions")
+
+class CacheBackend:
+    """Shared cache tier storing serialized values under string keys."""
+    name = "backend"
+
+    def __init__(self):
+        self.metrics = CacheMetrics()
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes):
+        raise NotImplementedError
+
+class SQLiteBackend(CacheBackend):
+    """File-backed shared tier usable by every worker process on a host."""
+    name = "sqlite"
+
+    def __init__(self, path: str, max_entries: int = 200000):
+        super().__init__()
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, updated_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_updated ON cache(updated_at)")
+        self._writes = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self.metrics.record("misses")
+            return None
+        self.metrics.record("hits")
+        return row[0]
+
+    def set(self, key: str, value: bytes):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, updated_at) VALUES (?, ?, ?)",
+                (key, value, time.time())
+            )
+            self.metrics.record("sets")
+            self._writes += 1
+            # Trimming is amortised over many writes to keep set() cheap
+            if self._writes % 1000 == 0:
+                count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+                excess = count - self.max_entries
+                if excess > 0:
+                    self._conn.execute(
+                        "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY updated_at LIMIT ?)",
+                        (excess,)
+                    )
+                    self.metrics.record("evictions", excess)
+
+class LocalKVClient:
+    """In-memory stand-in for a Redis client, for tests and single-process development."""
+
+    def __init__(self):
+        self._data: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key: str, value: bytes, ex: Optional[int] = None):
+        with self._lock:
+            self._data[key] = (value, time.time() + ex if ex else None)
+
+class RedisBackend(CacheBackend):
+    """Shared tier on a Redis-compatible server; entries expire after ttl seconds.
+
+    Evictions happen inside the server (maxmemory policy), so they are not
+    counted here.
+    """
+    name = "redis"
+
+    def __init__(self, client, ttl: int = 7 * 24 * 3600, prefix: str = "doce:"):
+        super().__init__()
+        self.client = client
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "RedisBackend":
+        if not REDIS_AVAILABLE:
+            raise ValueError("redis is not installed. Please install with: pip install redis")
+        return cls(redis.Redis.from_url(url), **kwargs)
+
+    def get(self, key: str) -> Optional[bytes]:
+        value = self.client.get(self.prefix + key)
+        self.metrics.record("hits" if value is not None else "misses")
+        return value
+
+    def set(self, key: str, value: bytes):
+        self.client.set(self.prefix + key, value, ex=self.ttl)
+        self.metrics.record("sets")
+
+class TwoLevelCache:
+    """An in-process LRU in front of an optional shared backend.
+
+    Values are JSON-serialisable objects. Hits in the shared tier are promoted
+    into the LRU; errors from the shared tier are reported and treated as misses.
+    """
+
+    def __init__(self, backend: Optional[CacheBackend] = None, max_entries: int = 10000):
+        self.local = LRUCache(max_entries)
+        self.backend = backend
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.local.get(key)
+        if value is not None or self.backend is None:
+            return value
+        try:
+            raw = self.backend.get(key)
+        except Exception as e:
+            print(f"Warning: shared cache read failed: {e}")
+            return None
+        if raw is None:
+            return None
+        value = json.loads(raw)
+        self.local.set(key, value)
+        return value
+
+    def set(self, key: str, value: Any):
+        self.local.set(key, value)
+        if self.backend is None:
+            return
+        try:
+            self.backend.set(key, json.dumps(value).encode("utf-8"))
+        except Exception as e:
+            print(f"Warning: shared cache write failed: {e}")
+
+    def stats(self) -> dict:
+        tiers = {"local": self.local.metrics.to_dict()}
+        if self.backend is not None:
+            tiers[self.backend.name] = self.backend.metrics.to_dict()
+        return tiers
+
+def backend_from_url(url: str) -> Optional[CacheBackend]:
+    """Creates the shared tier for a cache URL: sqlite:///path, redis://..., or none."""
+    if not url or url == "none":
+        return None
+    if url.startswith("sqlite:///"):
+        return SQLiteBackend(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend.from_url(url)
+    raise ValueError(f"Unsupported cache URL: {url}")
+
+def content_key(namespace: str, *parts: Any) -> str:
+    """Builds a cache key from a namespace and a hash of the given parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, str):
+            part = part.encode("utf-8")
+        elif part is None:
+            part = b""
+        elif not isinstance(part, bytes):
+            part = str(part).encode("utf-8")
+        digest.update(len(part).to_bytes(8, "big"))
+        digest.update(part)
+    return f"{namespace}:{digest.hexdigest()}"
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+def get_cache() -> TwoLevelCache:
+    """Returns the process-wide cache configured through DOCE_CACHE_URL."""
+    global _default_cache
+    with _default_cache_lock:
+        if _default_cache is None:
+            try:
+                backend = backend_from_url(DEFAULT_CACHE_URL)
+            except Exception as e:
+                print(f"Warning: shared cache unavailable, using in-process cache only: {e}")
+                backend = None
+            _default_cache = TwoLevelCache(backend)
+        return _default_cache
@@ -21,4 +21,5 @@ class Language(Enum):
     PERL = "perl"
     LUA = "lua"
     R = "r"
+    MATLAB = "matlab"  # Detected only to keep .m MATLAB files away from the Objective-C grammar
     UNKNOWN = "unknown"
\ No newline at end of file
@@ -1,24 +1,64 @@
 import os
-from flask import Flask, request, jsonify
-from constants import Language
-from utils import process_repository, get_programming_language, get_file_extension
+import time
+import queue
+import threading
+from flask import Flask, Response, request, jsonify, stream_with_context
+from utils import extract_repository
 from llm import LLM
+from journal import RunJournal, new_run_id
+from writers import OutputStage
+from search_index import DocIndex
+from scheduler import PriorityScheduler, SchedulerConfig
+from runner import DocumentationRun
+from prefilter import DocPrefilter, PrefilterConfig
+from symbols import SymbolGraph
+from git_diff import extract_changed_methods
+from watcher import WatchSession, format_sse, is_final_event
+from admission import FairAdmission, AdmissionConfig, QueueFullError
+from cache import get_cache
+from pipeline import DocumentationPipeline, PipelineConfig
+from serialization import json_response
+from language_detection import detection_stats
 
 app = Flask(__name__)
 llm = LLM()
+doc_index = DocIndex()
+watch_sessions = {}
+watch_lock = threading.Lock()
+admission = FairAdmission(AdmissionConfig.from_env())
 
 @app.route('/')
 def home():
     return "Documentation Generator API is running!"
 
+def client_id() -> str:
+    """Identifies the caller by a configured API key, falling back to the remote address.
+
+    Unknown keys are ignored, so rotating header values cannot buy extra quota.
+    """
+    api_key = request.headers.get("X-API-Key")
+    if api_key and admission.is_known_key(api_key):
+        return api_key
+    return request.remote_addr or "anonymous"
+
 @app.route('/process', methods=['POST'])
 def process():
     """Process a directory of source code files and generate documentation."""
+    data = request.get_json(silent=True)
+    if not data:
+        return jsonify({"error": "No JSON data provided"}), 400
+
+    # Each client queues fairly for a bounded number of concurrent runs
     try:
-        data = request.get_json()
-        if not data:
-            return jsonify({"error": "No JSON data provided"}), 400
+        with admission.slot(client_id()):
+            return _process(data)
+    except QueueFullError as e:
+        response = jsonify({"error": str(e), "retry_after": e.retry_after})
+        response.headers["Retry-After"] = str(int(e.retry_after))
+        return response, 429
 
+def _process(data: dict):
+    try:
         directory = data.get("directory")
         directory = os.path.abspath(directory)
         print(f"Processing directory: {directory}")
@@ -26,54 +66,196 @@ def process():
         if not directory or not os.path.exists(directory):
             return jsonify({"error": "Invalid or non-existent directory path"}), 400
 
-        # Initialize the results dictionary
-        results = {"files": [], "stats": {"processed": 0, "failed": 0}}
-        
-        # Process all files in the directory
-        for root, _, files in os.walk(directory):
-            for file in files:
-                file_path = os.path.join(root, file)
-                extension = get_file_extension(file)
-                
-                language = get_programming_language(extension)
-                if language != Language.UNKNOWN:
-                    file_result = process_repository(os.path.dirname(file_path), language)
-                    
-                    if "error" not in file_result:
-                        for file_info in file_result["files"]:
-                            methods_docs = []
-                            if "methods" in file_info:
-                                for method in file_info["methods"]:
-                                    try:
-                                        doc = llm.generate_structured_documentation(
-                                            language.value,
-                                            [method]
-                                        )
-                                        if doc and not isinstance(doc, str):
-                                            method_doc = doc.get(method["name"])
-                                            if method_doc and not method_doc.startswith("Error:"):
-                                                results["stats"]["processed"] += 1
-                                            else:
-                                                results["stats"]["failed"] += 1
-                                            methods_docs.append({
-                                                "name": method["name"],
-                                                "documentation": method_doc or "Failed to generate documentation"
-                                            })
-                                    except Exception as e:
-                                        print(f"Error processing method {method['name']}: {str(e)}")
-                                        methods_docs.append({
-                                            "name": method["name"],
-                                            "documentation": f"Error: {str(e)}"
-                                        })
-                                        results["stats"]["failed"] += 1
-                                
-                            results["files"].append({
-                                "file_path": file_info["file_path"],
-                                "language": language.value,
-                                "methods": methods_docs
-                            })
-
-        return jsonify(results), 200
+        repo = data.get("repo") or directory
+        try:
+            scheduler_config = SchedulerConfig.from_request(data.get("priority"))
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": f"Invalid priority options: {str(e)}"}), 400
+        try:
+            prefilter_config = PrefilterConfig.from_request(data.get("prefilter"))
+        except (TypeError, ValueError) as e:
+            return jsonify({"error": f"Invalid prefilter options: {str(e)}"}), 400
+        try:
+            context_tokens = int(data.get("context_tokens", 200))
+        except (TypeError, ValueError):
+            return jsonify({"error": "context_tokens must be an integer"}), 400
+
+        base_ref = data.get("base_ref")
+        if base_ref and data.get("output_dir"):
+            # Diff runs only see the touched methods, which would overwrite whole per-file docs
+            return jsonify({"error": "output_dir cannot be combined with base_ref"}), 400
+        pipeline_config = None
+        if data.get("pipeline") and not base_ref:
+            try:
+                pipeline_config = PipelineConfig.from_request(data["pipeline"] if isinstance(data["pipeline"], dict) else {})
+            except (TypeError, ValueError) as e:
+                return jsonify({"error": f"Invalid pipeline options: {str(e)}"}), 400
+
+        # Extract every method first so the scheduler can rank the whole repository,
+        # or only the methods touched between two revisions in diff mode.
+        # Pipelined runs extract while documenting instead.
+        extraction = {"files": []}
+        if base_ref:
+            extraction = extract_changed_methods(directory, base_ref, data.get("head_ref"))
+            if "error" in extraction:
+                return jsonify({"error": extraction["error"]}), 400
+        elif not pipeline_config:
+            extraction = extract_repository(directory)
+            if "error" in extraction:
+                return jsonify({"error": extraction["error"]}), 500
+
+        # Reusing a run id resumes that run from its journal
+        run_id = data.get("run_id") or new_run_id()
+        try:
+            journal = RunJournal(run_id)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # Optionally write the documentation tree to disk while generating
+        output_stage = None
+        if data.get("output_dir"):
+            try:
+                output_stage = OutputStage(directory, data["output_dir"], data.get("output_format", "markdown"))
+            except ValueError as e:
+                journal.close()
+                return jsonify({"error": str(e)}), 400
+
+        # The symbol graph gives each prompt a few lines of cross-method context
+        symbol_graph = SymbolGraph.build(extraction["files"])
+        scheduler = PriorityScheduler(
+            scheduler_config,
+            previous_hashes=doc_index.source_hashes(repo),
+            caller_counts=symbol_graph.caller_counts()
+        )
+        run = DocumentationRun(llm, repo, journal, doc_index, scheduler, output_stage,
+                               prefilter=DocPrefilter(prefilter_config),
+                               symbol_graph=symbol_graph if context_tokens > 0 else None,
+                               context_tokens=context_tokens,
+                               partial_files=bool(base_ref),
+                               include_source=bool(data.get("include_source", False)))
+        try:
+            if pipeline_config:
+                results = dict(run_id=run_id, **DocumentationPipeline(run, pipeline_config).execute(directory))
+            else:
+                results = dict(run_id=run_id, **run.run(extraction["files"]))
+        finally:
+            journal.close()
+            if output_stage:
+                output_stats = output_stage.close()
+
+        if output_stage:
+            results["output"] = output_stats
+        if base_ref:
+            results["diff"] = {"base_ref": base_ref, "head_ref": data.get("head_ref"), "files": len(extraction["files"])}
+        return json_response(results, 200, request.headers.get("Accept-Encoding"))
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/search', methods=['GET'])
+def search():
+    """Search previously generated documentation by full text and/or method name prefix."""
+    try:
+        query = (request.args.get("q") or "").strip()
+        name_prefix = (request.args.get("prefix") or "").strip()
+        if not query and not name_prefix:
+            return jsonify({"error": "Provide a 'q' or 'prefix' query parameter"}), 400
+
+        # SQLite treats a negative LIMIT as unlimited
+        limit = max(1, min(int(request.args.get("limit", 20)), 200))
+        start = time.perf_counter()
+        matches = doc_index.search(query, name_prefix, request.args.get("repo"), limit)
+        took_ms = (time.perf_counter() - start) * 1000
+
+        return json_response({"results": matches, "count": len(matches), "took_ms": round(took_ms, 3)}, 200,
+                             request.headers.get("Accept-Encoding"))
+
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+@app.route('/watch', methods=['POST', 'DELETE'])
+def watch():
+    """Start or stop keeping the documentation of a directory current as files change."""
+    try:
+        data = request.get_json()
+        if not data or not data.get("directory"):
+            return jsonify({"error": "No directory provided"}), 400
+
+        directory = os.path.abspath(data["directory"])
+        if request.method == 'DELETE':
+            with watch_lock:
+                session = watch_sessions.pop(directory, None)
+            if not session:
+                return jsonify({"error": f"Not watching: {directory}"}), 404
+            session.stop()
+            return jsonify({"stopped": directory}), 200
+
+        if not os.path.isdir(directory):
+            return jsonify({"error": "Invalid or non-existent directory path"}), 400
+        try:
+            debounce = float(data.get("debounce", 0.5))
+        except (TypeError, ValueError):
+            return jsonify({"error": "debounce must be a number of seconds"}), 400
+        if not 0 <= debounce <= 60:
+            return jsonify({"error": "debounce must be between 0 and 60 seconds"}), 400
+
+        with watch_lock:
+            session = watch_sessions.get(directory)
+            if not session:
+                session = WatchSession(
+                    directory, llm, doc_index,
+                    repo=data.get("repo"),
+                    debounce=debounce,
+                    use_polling=bool(data.get("polling", False))
+                )
+                session.start()
+                watch_sessions[directory] = session
+
+        return jsonify({"watching": directory, "mode": session.watcher.mode}), 200
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
+
+@app.route('/events', methods=['GET'])
+def events():
+    """Stream documentation updates of a watched directory as server-sent events."""
+    directory = os.path.abspath(request.args.get("directory", ""))
+    with watch_lock:
+        session = watch_sessions.get(directory)
+    if not session:
+        return jsonify({"error": f"Not watching: {directory}"}), 404
+
+    subscriber = session.events.subscribe()
+
+    def stream():
+        try:
+            # Sends the headers right away instead of with the first event
+            yield ": connected\n\n"
+            while True:
+                try:
+                    event = subscriber.get(timeout=15)
+                except queue.Empty:
+                    # Keep idle connections from being closed by proxies
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event)
+                if is_final_event(event):
+                    # The session was stopped; release the connection
+                    return
+        finally:
+            session.events.unsubscribe(subscriber)
+
+    return Response(stream_with_context(stream()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.route('/stats', methods=['GET'])
+def stats():
+    """Report queueing, cache and LLM latency statistics of the server."""
+    return jsonify({
+        "admission": admission.stats(),
+        "cache": get_cache().stats(),
+        "language_detection": detection_stats(),
+        "llm": llm.latency_stats()
+    }), 200
@@ -0,0 +1,117 @@
+import os
+import re
+import subprocess
+from typing import Optional, Dict, List, Tuple
+from utils import parse_methods
+from language_detection import detect_language, AMBIGUOUS_EXTENSIONS, get_file_extension
+from treesitter.language_config import LANGUAGE_CONFIGS
+
+_HUNK_HEADER = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@")
+
+class GitError(Exception):
+    pass
+
+def _git(repo_path: str, *args: str) -> bytes:
+    try:
+        completed = subprocess.run(
+            ["git", "-C", repo_path, *args],
+            capture_output=True,
+            check=True,
+            timeout=60
+        )
+    except FileNotFoundError:
+        raise GitError("git is not installed")
+    except subprocess.CalledProcessError as e:
+        raise GitError(e.stderr.decode("utf-8", "replace").strip() or f"git {args[0]} failed")
+    except subprocess.TimeoutExpired:
+        raise GitError(f"git {args[0]} timed out")
+    return completed.stdout
+
+def _validate_ref(ref: str):
+    if not ref or ref.startswith("-"):
+        raise GitError(f"Invalid git ref: {ref!r}")
+
+def changed_line_ranges(repo_path: str, base_ref: str, head_ref: Optional[str] = None) -> Dict[str, List[Tuple[int, int]]]:
+    """Returns the 0-based, inclusive line ranges touched on the head side of each changed file.
+
+    Without a head ref the base is compared against the working tree. Pure
+    deletions are reported as the line they were removed at, so the method
+    that contained them still counts as touched.
+    """
+    _validate_ref(base_ref)
+    args = ["-c", "core.quotePath=false", "diff", "--unified=0", "--no-color", "--no-ext-diff",
+            "--diff-filter=AMR", "-M", base_ref]
+    if head_ref:
+        _validate_ref(head_ref)
+        args.append(head_ref)
+
+    ranges: Dict[str, List[Tuple[int, int]]] = {}
+    current = None
+    for line in _git(repo_path, *args).decode("utf-8", "replace").splitlines():
+        if line.startswith("+++ "):
+            # git appends a tab to names containing spaces
+            path = line[4:].rstrip("\t")
+            current = path[2:] if path.startswith("b/") else None
+            if current is not None:
+                ranges.setdefault(current, [])
+            continue
+        match = _HUNK_HEADER.match(line)
+        if match and current is not None:
+            start = int(match.group(1))
+            count = int(match.group(2)) if match.group(2) is not None else 1
+            if count == 0:
+                ranges[current].append((max(start - 1, 0), start))
+            else:
+                ranges[current].append((start - 1, start + count - 2))
+    return ranges
+
+def _read_file(repo_root: str, path: str, head_ref: Optional[str]) -> bytes:
+    if head_ref:
+        return _git(repo_root, "show", f"{head_ref}:{path}")
+    with open(os.path.join(repo_root, path), "rb") as f:
+        return f.read()
+
+def touches(method: dict, ranges: List[Tuple[int, int]]) -> bool:
+    return any(start <= method["end_line"] and end >= method["start_line"] for start, end in ranges)
+
+def extract_changed_methods(directory: str, base_ref: str, head_ref: Optional[str] = None) -> dict:
+    """Extracts only the methods touched between two revisions, in the shape of extract_repository."""
+    try:
+        repo_root = _git(directory, "rev-parse", "--show-toplevel").decode("utf-8").strip()
+        ranges = changed_line_ranges(repo_root, base_ref, head_ref)
+    except GitError as e:
+        return {"error": str(e)}
+
+    real_directory = os.path.realpath(directory)
+    result = {"files": []}
+    for path, file_ranges in sorted(ranges.items()):
+        # Report paths under the requested directory so journal and index keys match full runs
+        relative_path = os.path.relpath(os.path.realpath(os.path.join(repo_root, path)), real_directory)
+        if relative_path.startswith(os.pardir):
+            continue
+        file_path = os.path.join(directory, relative_path)
+
+        if not file_ranges:
+            continue
+        # Ambiguous extensions are classified from the revision's content, not the working tree
+        content = None
+        if get_file_extension(path) in AMBIGUOUS_EXTENSIONS:
+            try:
+                content = _read_file(repo_root, path, head_ref)
+            except (GitError, OSError):
+                continue
+        language = detect_language(file_path, content)
+        if language not in LANGUAGE_CONFIGS:
+            continue
+
+        file_result = {"file_path": file_path, "language": language}
+        try:
+            if content is None:
+                content = _read_file(repo_root, path, head_ref)
+            methods = parse_methods(content, language)
+            file_result["methods"] = [method for method in methods if touches(method, file_ranges)]
+        except Exception as e:
+            file_result["error"] = f"Error processing file: {str(e)}"
+        if file_result.get("methods") or "error" in file_result:
+            result["files"].append(file_result)
+    return result
@@ -0,0 +1,104 @@
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Optional, Dict
+
+@dataclass
+class HedgePolicy:
+    enabled: bool = False
+    percentile: float = 95.0
+    initial_delay: float = 10.0  # hedge delay until enough latencies are known
+    min_delay: float = 0.5
+    min_samples: int = 20
+    max_hedge_rate: float = 0.05
+    fallback_model: Optional[str] = None
+
+    @classmethod
+    def from_env(cls) -> "HedgePolicy":
+        """Reads hedging options from DOCE_HEDGE_* environment variables, falling back to the defaults."""
+        defaults = cls()
+        policy = cls(
+            enabled=os.getenv("DOCE_HEDGE_ENABLED", "").lower() in ("1", "true", "yes"),
+            percentile=float(os.getenv("DOCE_HEDGE_PERCENTILE", defaults.percentile)),
+            initial_delay=float(os.getenv("DOCE_HEDGE_INITIAL_DELAY", defaults.initial_delay)),
+            max_hedge_rate=float(os.getenv("DOCE_HEDGE_MAX_RATE", defaults.max_hedge_rate)),
+            fallback_model=os.getenv("DOCE_HEDGE_MODEL") or None
+        )
+        if not 0 < policy.percentile < 100:
+            raise ValueError("DOCE_HEDGE_PERCENTILE must be between 0 and 100")
+        if not 0 <= policy.max_hedge_rate <= 1:
+            raise ValueError("DOCE_HEDGE_MAX_RATE must be between 0 and 1")
+        return policy
+
+class LatencyTracker:
+    """Keeps a sliding window of successful call latencies per provider."""
+
+    def __init__(self, window: int = 500):
+        self.window = window
+        self._samples: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, seconds: float):
+        with self._lock:
+            samples = self._samples.get(provider)
+            if samples is None:
+                samples = self._samples[provider] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def count(self, provider: str) -> int:
+        with self._lock:
+            return len(self._samples.get(provider, ()))
+
+    def percentile(self, provider: str, percentile: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get(provider, ()))
+        if not samples:
+            return None
+        rank = min(int(len(samples) * percentile / 100), len(samples) - 1)
+        return samples[rank]
+
+    def stats(self) -> dict:
+        with self._lock:
+            providers = list(self._samples)
+        result = {}
+        for provider in providers:
+            result[provider] = {
+                "samples": self.count(provider),
+                **{f"p{p}": round(self.percentile(provider, p), 3) for p in (50, 95, 99)}
+            }
+        return result
+
+class HedgeBudget:
+    """Caps hedges to a fraction of all primary requests."""
+
+    def __init__(self, max_rate: float):
+        self.max_rate = max_rate
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._lock = threading.Lock()
+
+    def record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self.hedges + 1 > self.max_rate * self.requests:
+                return False
+            self.hedges += 1
+            return True
+
+    def record_win(self):
+        with self._lock:
+            self.hedge_wins += 1
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "hedge_rate": round(self.hedges / self.requests, 4) if self.requests else 0.0
+            }
@@ -0,0 +1,91 @@
+import os
+import json
+import uuid
+import threading
+from typing import Optional, Dict, Tuple
+
+DEFAULT_JOURNAL_DIR = os.getenv("DOCE_JOURNAL_DIR", ".doce_runs")
+
+def new_run_id() -> str:
+    """Returns a fresh identifier for a documentation run."""
+    return uuid.uuid4().hex
+
+class RunJournal:
+    """Append-only journal of the method documentation finished during a run.
+
+    Every record is flushed and fsynced as soon as it is written, so a run that
+    dies partway through can be restarted with the same run id and skip the
+    methods that were already documented.
+    """
+
+    def __init__(self, run_id: str, journal_dir: str = None):
+        if not run_id or not all(c.isalnum() or c in "-_" for c in run_id):
+            raise ValueError(f"Invalid run id: {run_id!r}")
+
+        self.run_id = run_id
+        self.journal_dir = journal_dir or DEFAULT_JOURNAL_DIR
+        os.makedirs(self.journal_dir, exist_ok=True)
+        self.path = os.path.join(self.journal_dir, f"{run_id}.jsonl")
+
+        self._entries: Dict[Tuple[str, str, int], str] = {}
+        self._lock = threading.Lock()
+        self._load()
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    @staticmethod
+    def _key(file_path: str, method: dict) -> Tuple[str, str, int]:
+        return file_path, method.get("name"), method.get("start_line", 0)
+
+    def _load(self):
+        """Reads the records of a previous attempt of this run, if any."""
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            content = f.read()
+
+        for line in content.splitlines():
+            try:
+                record = json.loads(line)
+                key = (record["file_path"], record["name"], record.get("start_line", 0))
+                self._entries[key] = record["documentation"]
+            except (ValueError, KeyError, TypeError):
+                # A crash can leave a partially written last line behind
+                continue
+
+        if content and not content.endswith("\n"):
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n")
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, file_path: str, method: dict) -> Optional[str]:
+        """Returns the journaled documentation for a method, or None if it is not done yet."""
+        return self._entries.get(self._key(file_path, method))
+
+    def record(self, file_path: str, method: dict, documentation: str):
+        """Durably records the documentation generated for a method."""
+        key = self._key(file_path, method)
+        line = json.dumps({
+            "file_path": key[0],
+            "name": key[1],
+            "start_line": key[2],
+            "documentation": documentation
+        })
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._entries[key] = documentation
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
@@ -0,0 +1,176 @@
+import os
+import re
+import hashlib
+from pathlib import Path
+from typing import Optional
+from constants import Language
+from cache import LRUCache
+
+EXTENSION_LANGUAGES = {
+    ".py": Language.PYTHON,
+    ".js": Language.JAVASCRIPT,
+    ".jsx": Language.JAVASCRIPT,
+    ".ts": Language.TYPESCRIPT,
+    ".tsx": Language.TYPESCRIPT,
+    ".java": Language.JAVA,
+    ".cpp": Language.CPP,
+    ".hpp": Language.CPP,
+    ".c": Language.C,
+    ".h": Language.C,
+    ".html": Language.HTML,
+    ".htm": Language.HTML,
+    ".css": Language.CSS,
+    ".php": Language.PHP,
+    ".rb": Language.RUBY,
+    ".go": Language.GO,
+    ".rs": Language.RUST,
+    ".swift": Language.SWIFT,
+    ".kt": Language.KOTLIN,
+    ".cs": Language.C_SHARP,
+    ".m": Language.OBJECTIVE_C,
+    ".mm": Language.OBJECTIVE_C,
+    ".scala": Language.SCALA,
+    ".pl": Language.PERL,
+    ".lua": Language.LUA,
+    ".r": Language.R
+}
+
+# Extensions shared by several languages; only these (and extensionless
+# executables) have their content inspected
+AMBIGUOUS_EXTENSIONS = {".h", ".m", ""}
+
+# Only the head of a file is inspected, which keeps detection cheap during the walk
+HEAD_SIZE = 4096
+
+# Names used by vim filetypes, emacs modes and shebang interpreters
+LANGUAGE_ALIASES = {
+    "python": Language.PYTHON, "python2": Language.PYTHON, "python3": Language.PYTHON,
+    "javascript": Language.JAVASCRIPT, "js": Language.JAVASCRIPT, "node": Language.JAVASCRIPT,
+    "typescript": Language.TYPESCRIPT, "ts": Language.TYPESCRIPT, "ts-node": Language.TYPESCRIPT,
+    "java": Language.JAVA,
+    "cpp": Language.CPP, "c++": Language.CPP,
+    "c": Language.C,
+    "objc": Language.OBJECTIVE_C, "objective-c": Language.OBJECTIVE_C, "objcpp": Language.OBJECTIVE_C,
+    "matlab": Language.MATLAB, "octave": Language.MATLAB,
+    "php": Language.PHP,
+    "ruby": Language.RUBY,
+    "go": Language.GO,
+    "rust": Language.RUST,
+    "swift": Language.SWIFT,
+    "kotlin": Language.KOTLIN,
+    "cs": Language.C_SHARP, "csharp": Language.C_SHARP,
+    "scala": Language.SCALA,
+    "perl": Language.PERL,
+    "lua": Language.LUA,
+    "r": Language.R, "rscript": Language.R
+}
+
+VIM_MODELINE_PATTERN = re.compile(rb"\b(?:vim?|ex):.*?\b(?:ft|filetype|syntax)=([\w+-]+)")
+EMACS_MODELINE_PATTERN = re.compile(rb"-\*-(?:.*?\bmode:\s*([\w+-]+).*?|\s*([\w+-]+)\s*)-\*-", re.IGNORECASE)
+
+OBJC_MARKERS = re.compile(rb"^\s*(?:@interface|@implementation|@protocol|@end\b|@property|#import\b)|\bNS[A-Z]\w+\s*\*", re.MULTILINE)
+CPP_MARKERS = re.compile(
+    rb"^\s*(?:class\s+\w+\s*[:{]|namespace\s+\w*\s*\{|template\s*<|(?:public|private|protected)\s*:|using\s+namespace\b)"
+    rb"|\bstd::|#include\s*<(?:iostream|string|vector|map|memory|algorithm)>",
+    re.MULTILINE
+)
+MATLAB_MARKERS = re.compile(
+    rb"^\s*(?:function\s+(?:\[[^\]]*\]|\w+)\s*=|%[%{ ]|end\s*$|disp\s*\(|fprintf\s*\()",
+    re.MULTILINE
+)
+
+_detections = LRUCache(max_entries=50000)
+
+def get_file_extension(file_path: str) -> str:
+    """Returns the file extension from a path."""
+    return Path(file_path).suffix.lower()
+
+def language_for_extension(file_extension: str) -> Language:
+    return EXTENSION_LANGUAGES.get(file_extension.lower(), Language.UNKNOWN)
+
+def _alias(name: bytes) -> Optional[Language]:
+    return LANGUAGE_ALIASES.get(name.decode("ascii", "ignore").lower())
+
+def from_shebang(head: bytes) -> Optional[Language]:
+    """Maps '#!/usr/bin/env python3' style interpreter lines to a language."""
+    if not head.startswith(b"#!"):
+        return None
+    words = head[2:].split(b"\n", 1)[0].split()
+    if not words:
+        return None
+    interpreter = os.path.basename(words[0])
+    if interpreter == b"env":
+        # Skip env's options (-S, -i, ...) and VAR=value assignments
+        arguments = [word for word in words[1:] if not word.startswith(b"-") and b"=" not in word]
+        if not arguments:
+            return None
+        interpreter = os.path.basename(arguments[0])
+    # python3.11 -> python3
+    return _alias(re.sub(rb"[\d.]+$", b"", interpreter)) or _alias(interpreter)
+
+def from_modeline(head: bytes) -> Optional[Language]:
+    """Reads a vim 'ft=' or emacs 'mode:' modeline from the first or last lines of the head."""
+    lines = head.splitlines()
+    for line in lines[:5] + lines[-5:]:
+        match = VIM_MODELINE_PATTERN.search(line)
+        if match:
+            return _alias(match.group(1))
+        match = EMACS_MODELINE_PATTERN.search(line)
+        if match:
+            return _alias(match.group(1) or match.group(2))
+    return None
+
+def from_content(extension: str, head: bytes) -> Optional[Language]:
+    """Separates the languages sharing .h and .m by counting characteristic constructs."""
+    if extension == ".h":
+        if OBJC_MARKERS.search(head):
+            return Language.OBJECTIVE_C
+        if CPP_MARKERS.search(head):
+            return Language.CPP
+        return Language.C
+    if extension == ".m":
+        objc = len(OBJC_MARKERS.findall(head))
+        matlab = len(MATLAB_MARKERS.findall(head))
+        return Language.MATLAB if matlab > objc else Language.OBJECTIVE_C
+    return None
+
+def classify(extension: str, head: bytes) -> Language:
+    """Classifies a file from its extension and the first bytes of its content."""
+    if b"\0" in head:
+        return Language.UNKNOWN
+
+    key = hashlib.sha1(extension.encode("utf-8") + b"\0" + head).hexdigest()
+    language = _detections.get(key)
+    if language is None:
+        language = (
+            from_modeline(head)
+            or from_shebang(head)
+            or from_content(extension, head)
+            or language_for_extension(extension)
+        )
+        _detections.set(key, language)
+    return language
+
+def detect_language(file_path: str, head: Optional[bytes] = None) -> Language:
+    """Returns the language of a file, looking at its content only when the extension is ambiguous.
+
+    Extensionless files are inspected only if executable (scripts with a
+    shebang), unless their head is passed in, so walks over large trees do
+    not open every extensionless file.
+    """
+    extension = get_file_extension(file_path)
+    if extension not in AMBIGUOUS_EXTENSIONS:
+        return language_for_extension(extension)
+
+    if head is None:
+        if not extension and not os.access(file_path, os.X_OK):
+            return Language.UNKNOWN
+        try:
+            with open(file_path, 'rb') as f:
+                head = f.read(HEAD_SIZE)
+        except OSError:
+            return language_for_extension(extension)
+    return classify(extension, head[:HEAD_SIZE])
+
+def detection_stats() -> dict:
+    return _detections.metrics.to_dict()
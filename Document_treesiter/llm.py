@@ -1,9 +1,12 @@
 import os
 import time
 import requests
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from typing import Optional, Dict, List
 from dotenv import load_dotenv
 from treesitter.treesitter import TreesitterMethodNode
+from prefilter import method_signature, clean_doc_comment
+from hedging import HedgePolicy, LatencyTracker, HedgeBudget
 
 load_dotenv()
 
@@ -14,17 +17,24 @@ class LLM:
         model: str = "gemini-2.0-flash",
         max_tokens: int = 1000,
         max_retries: int = 3,
-        retry_delay: int = 1
+        retry_delay: int = 1,
+        hedge_policy: HedgePolicy = None
     ):
         self.api_key = api_key or os.getenv("GEMINI_API_KEY")
         if not self.api_key:
             raise ValueError("GEMINI_API_KEY not provided and not found in environment")
             
-        self.api_endpoint = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent"
         self.model = model
         self.max_tokens = max_tokens
         self.max_retries = max_retries
         self.retry_delay = retry_delay
+
+        # Optional hedging: a request slower than the latency percentile gets a duplicate
+        self.hedge_policy = hedge_policy or HedgePolicy.from_env()
+        self.latencies = LatencyTracker()
+        self.hedge_budget = HedgeBudget(self.hedge_policy.max_hedge_rate)
+        self._hedge_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="llm-hedge") \
+            if self.hedge_policy.enabled else None
         
         # Template for whole file documentation
         self.file_template = """
@@ -57,6 +67,9 @@ class LLM:
         Method Source Code:
         {method_source}
         
+        Related Code Context:
+        {context}
+        
         Instructions:
         1. Document this method's purpose and functionality
         2. Parameters and their types
@@ -66,6 +79,84 @@ class LLM:
         6. Any important dependencies or requirements
         """
 
+        # Shorter template for methods that already carry partial documentation
+        self.refine_template = """
+        Refine the existing documentation of the following {language} method.
+        Keep it concise and add only what is missing about parameters and return values.
+        
+        Method Signature:
+        {method_signature}
+        
+        Existing Documentation:
+        {doc_comment}
+        """
+
+    @staticmethod
+    def endpoint_for(model: str) -> str:
+        return f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent"
+
+    def _post(self, model: str, payload: dict, params: dict, headers: dict) -> requests.Response:
+        """Sends one request to a model, recording its latency when it succeeds."""
+        start = time.monotonic()
+        response = requests.post(
+            self.endpoint_for(model),
+            params=params,
+            json=payload,
+            headers=headers,
+            timeout=30 # Adding timeout
+        )
+        if response.status_code == 200:
+            self.latencies.record(model, time.monotonic() - start)
+        return response
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for the primary request before sending a hedge."""
+        policy = self.hedge_policy
+        if self.latencies.count(self.model) < policy.min_samples:
+            return policy.initial_delay
+        return max(self.latencies.percentile(self.model, policy.percentile), policy.min_delay)
+
+    def _send(self, payload: dict, params: dict, headers: dict) -> requests.Response:
+        """Sends a request, hedging it with a duplicate if it is slower than usual.
+
+        The first successful response wins. The loser cannot be aborted once it is
+        on the wire, so it is left to finish in the background and its result is
+        discarded (a hedge still waiting for a worker thread is cancelled).
+        """
+        if not self.hedge_policy.enabled:
+            return self._post(self.model, payload, params, headers)
+
+        self.hedge_budget.record_request()
+        primary = self._hedge_executor.submit(self._post, self.model, payload, params, headers)
+        done, _ = wait([primary], timeout=self.hedge_delay())
+        if done or not self.hedge_budget.try_acquire():
+            return primary.result()
+
+        hedge_model = self.hedge_policy.fallback_model or self.model
+        hedge = self._hedge_executor.submit(self._post, hedge_model, payload, params, headers)
+        pending = {primary, hedge}
+        winner = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None and future.result().status_code == 200:
+                    winner = future
+                    break
+            if winner:
+                break
+        for future in pending:
+            future.cancel()
+
+        if winner is None:
+            # Neither answered successfully; report the primary's outcome
+            return primary.result()
+        if winner is hedge:
+            self.hedge_budget.record_win()
+        return winner.result()
+
+    def latency_stats(self) -> dict:
+        return {"latency": self.latencies.stats(), "hedging": self.hedge_budget.to_dict()}
+
     def call_gemini_api(self, prompt: str) -> Optional[str]:
         headers = {"Content-Type": "application/json"}
         
@@ -88,13 +179,7 @@ class LLM:
         
         for attempt in range(self.max_retries):
             try:
-                response = requests.post(
-                    self.api_endpoint,
-                    params=params,
-                    json=payload,
-                    headers=headers,
-                    timeout=30 # Adding timeout
-                )
+                response = self._send(payload, params, headers)
                 
                 if response.status_code == 400:
                     print(f"API Error Response: {response.text}")
@@ -141,19 +226,27 @@ class LLM:
         except Exception as e:
             return f"Error generating documentation: {str(e)}"
 
-    def generate_structured_documentation(self, language: str, methods: List[TreesitterMethodNode]) -> Dict[str, str]:
+    def generate_structured_documentation(self, language: str, methods: List[TreesitterMethodNode], refine: bool = False) -> Dict[str, str]:
         documentation = {}
         try:
             for method in methods:
                 if not method.get("name"):
                     continue
                     
-                prompt = self.method_template.format(
-                    language=language,
-                    method_name=method["name"],
-                    doc_comment=method.get("doc_comment", "No documentation provided"),
-                    method_source=method.get("source_code", "")
-                )
+                if refine:
+                    prompt = self.refine_template.format(
+                        language=language,
+                        method_signature=method_signature(method.get("source_code", "")),
+                        doc_comment=clean_doc_comment(method.get("doc_comment"))
+                    )
+                else:
+                    prompt = self.method_template.format(
+                        language=language,
+                        method_name=method["name"],
+                        doc_comment=method.get("doc_comment", "No documentation provided"),
+                        method_source=method.get("source_code", ""),
+                        context=method.get("context") or "None"
+                    )
                 
                 method_doc = self.call_gemini_api(prompt)
                 if method_doc and not method_doc.startswith("Error:"):
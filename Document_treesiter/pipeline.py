@@ -0,0 +1,196 @@
+import os
+import queue
+import collections
+import asyncio
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Optional
+from utils import extract_file
+from language_detection import detect_language
+from treesitter.language_config import LANGUAGE_CONFIGS
+from runner import DocumentationRun
+
+_DONE = object()
+MAX_LLM_CONCURRENCY = 256
+
+@dataclass
+class PipelineConfig:
+    parse_workers: int = max((os.cpu_count() or 2) - 1, 1)
+    llm_concurrency: int = 4
+    queue_size: int = 64
+
+    @classmethod
+    def from_request(cls, options: Optional[dict]) -> "PipelineConfig":
+        """Builds a config from the "pipeline" object of a /process request."""
+        options = options or {}
+        defaults = cls()
+        config = cls(
+            parse_workers=int(options.get("parse_workers", defaults.parse_workers)),
+            llm_concurrency=int(options.get("llm_concurrency", defaults.llm_concurrency)),
+            queue_size=int(options.get("queue_size", defaults.queue_size))
+        )
+        if min(config.parse_workers, config.llm_concurrency, config.queue_size) < 1:
+            raise ValueError("Pipeline sizes must be at least 1")
+        if config.llm_concurrency > MAX_LLM_CONCURRENCY:
+            raise ValueError(f"llm_concurrency must be at most {MAX_LLM_CONCURRENCY}")
+        return config
+
+    @property
+    def max_pending_methods(self) -> int:
+        """Methods that may wait for the LLM before parsed files stop being taken in."""
+        return self.queue_size * self.llm_concurrency
+
+class DocumentationPipeline:
+    """Overlaps file discovery, parsing and LLM calls in bounded, concurrent stages.
+
+    discovery (thread) -> paths queue -> parsing (worker processes) -> parsed
+    queue -> LLM stage (asyncio tasks on llm_concurrency threads). Each queue is
+    bounded, and parsed files are only taken into the scheduler while fewer than
+    max_pending_methods methods wait, so a slow LLM applies backpressure all the
+    way upstream instead of buffering the whole repository. Methods are
+    dispatched in scheduler priority among the work known so far.
+    """
+
+    def __init__(self, run: DocumentationRun, config: PipelineConfig = None):
+        self.run = run
+        self.config = config or PipelineConfig()
+        self._paths = queue.Queue(maxsize=self.config.queue_size)
+        self._parsed = queue.Queue(maxsize=self.config.queue_size)
+        self._errors = []
+        self._cancelled = threading.Event()
+
+    def _put(self, target: queue.Queue, item):
+        """Blocking put that gives up once the pipeline has been cancelled."""
+        while not self._cancelled.is_set():
+            try:
+                target.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def _discover(self, directory: str):
+        try:
+            for root, _, files in os.walk(directory):
+                for file in files:
+                    if self._cancelled.is_set():
+                        return
+                    file_path = os.path.join(root, file)
+                    if detect_language(file_path) in LANGUAGE_CONFIGS:
+                        self._put(self._paths, file_path)
+        except Exception as e:
+            self._errors.append(f"Discovery failed: {str(e)}")
+        finally:
+            self._put(self._paths, _DONE)
+
+    def _parse(self, executor: ProcessPoolExecutor):
+        # A few parses beyond the worker count keep every process busy
+        max_in_flight = self.config.parse_workers * 2
+        in_flight = collections.deque()
+
+        def forward_oldest():
+            future = in_flight.popleft()
+            try:
+                file_info = future.result()
+            except Exception as e:
+                self._errors.append(f"Parse worker failed: {str(e)}")
+                return
+            if file_info is not None:
+                self._put(self._parsed, file_info)
+
+        try:
+            while not self._cancelled.is_set():
+                try:
+                    file_path = self._paths.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if file_path is _DONE:
+                    break
+                if len(in_flight) >= max_in_flight:
+                    forward_oldest()
+                in_flight.append(executor.submit(extract_file, file_path))
+            while in_flight and not self._cancelled.is_set():
+                forward_oldest()
+        finally:
+            self._put(self._parsed, _DONE)
+
+    def _ingest(self, file_info: dict):
+        if self.run.symbol_graph:
+            self.run.symbol_graph.add_file(file_info)
+        self.run.add_file(file_info)
+
+    async def _llm_stage(self) -> dict:
+        loop = asyncio.get_running_loop()
+        # Sized to llm_concurrency; the default executor would silently cap it
+        llm_executor = ThreadPoolExecutor(max_workers=self.config.llm_concurrency, thread_name_prefix="llm")
+
+        async def document(item):
+            documentation, cached = await loop.run_in_executor(llm_executor, self.run.generate, item)
+            return item, documentation, cached
+
+        try:
+            return await self._dispatch(loop, document)
+        finally:
+            llm_executor.shutdown(wait=False)
+
+    async def _dispatch(self, loop, document) -> dict:
+        tasks = set()
+        parsing_done = False
+        while True:
+            # Take in parsed files without blocking, until enough work is waiting
+            while not parsing_done and len(self.run.scheduler) < self.config.max_pending_methods:
+                try:
+                    file_info = self._parsed.get_nowait()
+                except queue.Empty:
+                    break
+                if file_info is _DONE:
+                    parsing_done = True
+                else:
+                    self._ingest(file_info)
+
+            while len(tasks) < self.config.llm_concurrency:
+                item = self.run.next_item()
+                if item is None:
+                    break
+                tasks.add(asyncio.ensure_future(document(item)))
+
+            if not tasks:
+                if parsing_done:
+                    break
+                # Nothing to document yet, so wait for the parsers
+                file_info = await loop.run_in_executor(None, self._parsed.get)
+                if file_info is _DONE:
+                    parsing_done = True
+                else:
+                    self._ingest(file_info)
+                continue
+
+            done, tasks = await asyncio.wait(tasks, timeout=0.05, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                item, documentation, cached = task.result()
+                self.run.complete(item, documentation, cached)
+
+        return self.run.finish()
+
+    def execute(self, directory: str) -> dict:
+        """Runs all stages over a directory and returns the run's results."""
+        # Forked workers would inherit the cache's SQLite connection and locks while
+        # LLM threads use them, so workers start fresh and open their own cache
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.config.parse_workers, mp_context=context) as executor:
+            discovery = threading.Thread(target=self._discover, args=(directory,), daemon=True)
+            parsing = threading.Thread(target=self._parse, args=(executor,), daemon=True)
+            discovery.start()
+            parsing.start()
+            try:
+                result = asyncio.run(self._llm_stage())
+            finally:
+                # Unblocks the upstream stages if the LLM stage stopped early
+                self._cancelled.set()
+                discovery.join()
+                parsing.join()
+
+        if self._errors:
+            result["pipeline_errors"] = self._errors
+        return result
@@ -0,0 +1,241 @@
+import re
+from dataclasses import dataclass
+from typing import Optional, List, Tuple
+from constants import Language
+
+_IDENTIFIER = re.compile(r"[A-Za-z_]\w*")
+_RETURN_VALUE = re.compile(r"\breturn\s+[^\s;}]")
+_RETURN_DOC = re.compile(r"(@returns?\b|:r?type\b|\breturns?\b|\byields?\b)", re.IGNORECASE)
+_ACCESSOR_NAME = re.compile(r"^(get|set|is|has)(?:_([a-z]\w*)|([A-Z]\w*))$")
+_COMMENT_MARKERS = re.compile(r"^\s*(/\*\*+|/\*+|\*+/|\*|///|//|#|\"\"\"|''')\s?")
+
+# Comments that are not documentation: placeholders and licence headers
+_PLACEHOLDER_DOC = re.compile(
+    r"^\W*(TODO|FIXME|XXX|HACK)\b|copyright|licen[cs]ed? under|SPDX-License-Identifier|all rights reserved",
+    re.IGNORECASE
+)
+
+_IMPLICIT_PARAMETERS = {"self", "cls", "this"}
+# A plain field, optionally through self/this/a receiver: self._name, this.name, s.name, name
+_FIELD = r"(?:(?:self|this|[a-z_]\w*)\.)?[A-Za-z_]\w*"
+_GETTER_BODY = re.compile(rf"^return\s+{_FIELD};?$")
+_TYPE_AFTER_NAME = (Language.PYTHON, Language.RUST, Language.KOTLIN, Language.TYPESCRIPT, Language.JAVASCRIPT)
+
+def method_signature(source_code: str, max_lines: int = 5) -> str:
+    """Returns the declaration of a method without its body."""
+    lines = (source_code or "").splitlines()[:max_lines]
+    signature = []
+    for line in lines:
+        brace = line.find("{")
+        if brace != -1:
+            signature.append(line[:brace].rstrip())
+            break
+        signature.append(line.rstrip())
+        if line.rstrip().endswith(":") or line.rstrip().endswith("=>"):
+            break
+    return "\n".join(signature).strip()
+
+def clean_doc_comment(doc_comment: Optional[str]) -> str:
+    """Strips comment delimiters and docstring quotes from a doc comment."""
+    lines = []
+    for line in (doc_comment or "").strip().splitlines():
+        line = _COMMENT_MARKERS.sub("", line)
+        line = re.sub(r"(\*/|\"\"\"|''')\s*$", "", line)
+        lines.append(line.rstrip())
+    return "\n".join(lines).strip()
+
+def _parenthesised(text: str, start: int) -> Tuple[str, int]:
+    """Returns the text inside the parentheses opening at start and the index of the closing one."""
+    depth = 0
+    for position in range(start, len(text)):
+        if text[position] == "(":
+            depth += 1
+        elif text[position] == ")":
+            depth -= 1
+            if depth == 0:
+                return text[start + 1:position], position
+    return text[start + 1:], len(text)
+
+def _parameter_list(source_code: str, language: Language) -> str:
+    """Returns the text between the outermost parentheses of the declaration."""
+    signature = method_signature(source_code)
+    start = signature.find("(")
+    if start == -1:
+        return ""
+    if language == Language.GO and signature[:start].strip() == "func":
+        # Skip the receiver of a Go method: func (s *Server) Handle(...)
+        _, end = _parenthesised(signature, start)
+        start = signature.find("(", end + 1)
+        if start == -1:
+            return ""
+    return _parenthesised(signature, start)[0]
+
+def _body_statements(source_code: str) -> List[str]:
+    """Returns the statements of a method body, without comments and docstrings."""
+    source_code = source_code or ""
+    if "{" in source_code:
+        body = source_code[source_code.find("{") + 1:source_code.rfind("}")]
+    else:
+        lines = source_code.splitlines()
+        header = next((i for i, line in enumerate(lines) if line.rstrip().endswith(":")), None)
+        if header is not None:
+            body = "\n".join(lines[header + 1:])
+        else:
+            # One-line definitions: def name(self): return self._name
+            one_line = re.match(r"^\s*def\s.*?\)\s*(?:->[^:]*)?:\s*(\S.*)$", lines[0] if lines else "")
+            if not one_line:
+                return []
+            body = one_line.group(1)
+        body = re.sub(r"^\s*(\"\"\"|''')[\s\S]*?\1", "", body)
+    statements = []
+    for line in body.splitlines():
+        line = re.sub(r"(//|#).*$", "", line).strip()
+        statements.extend(part.strip() for part in line.split(";") if part.strip())
+    return statements
+
+def extract_parameters(source_code: str, language: Language) -> List[str]:
+    """Heuristically extracts parameter names from a method declaration."""
+    parameters, depth, current = [], 0, ""
+    for char in _parameter_list(source_code, language):
+        if char in "([{<":
+            depth += 1
+        elif char in ")]}>":
+            depth -= 1
+        if char == "," and depth == 0:
+            parameters.append(current)
+            current = ""
+        else:
+            current += char
+    parameters.append(current)
+
+    names = []
+    for parameter in parameters:
+        parameter = parameter.split("=", 1)[0].strip()
+        if not parameter or parameter == "...":
+            continue
+        if language in _TYPE_AFTER_NAME or ":" in parameter:
+            candidates = _IDENTIFIER.findall(parameter.split(":", 1)[0])
+            candidates = [c for c in candidates if c not in ("mut", "val", "var", "readonly", "public", "private")]
+            name = candidates[-1] if candidates else None
+        elif language == Language.GO:
+            candidates = _IDENTIFIER.findall(parameter)
+            name = candidates[0] if candidates else None
+        else:
+            candidates = _IDENTIFIER.findall(parameter)
+            name = candidates[-1] if candidates else None
+        if name and name not in _IMPLICIT_PARAMETERS:
+            names.append(name)
+    return names
+
+def has_return_value(source_code: str, language: Language) -> bool:
+    """Heuristically decides whether a method returns a value."""
+    signature = method_signature(source_code)
+    if language == Language.RUST:
+        return "->" in signature
+    if language == Language.PYTHON and "->" in signature:
+        return "-> None" not in signature
+    return bool(_RETURN_VALUE.search(source_code or ""))
+
+@dataclass
+class PrefilterConfig:
+    enabled: bool = True
+    skip_threshold: float = 1.0
+    refine_threshold: float = 0.5
+    trivial_max_lines: int = 3
+    min_summary_words: int = 5
+
+    @classmethod
+    def from_request(cls, options: Optional[dict]) -> "PrefilterConfig":
+        """Builds a config from the optional "prefilter" object of a /process request."""
+        options = options or {}
+        defaults = cls()
+        return cls(
+            enabled=bool(options.get("enabled", defaults.enabled)),
+            skip_threshold=float(options.get("skip_threshold", defaults.skip_threshold)),
+            refine_threshold=float(options.get("refine_threshold", defaults.refine_threshold)),
+            trivial_max_lines=int(options.get("trivial_max_lines", defaults.trivial_max_lines)),
+            min_summary_words=int(options.get("min_summary_words", defaults.min_summary_words))
+        )
+
+@dataclass
+class PrefilterDecision:
+    action: str  # "skip", "template", "refine" or "full"
+    coverage: float = 0.0
+    documentation: Optional[str] = None
+
+class DocPrefilter:
+    """Decides how much LLM work a method needs based on the documentation it already has.
+
+    Methods whose doc comment covers every parameter and the return value reuse
+    it as-is, partially documented methods get a short refine prompt, and
+    trivial accessors get template documentation without any LLM call.
+    """
+
+    def __init__(self, config: PrefilterConfig = None):
+        self.config = config or PrefilterConfig()
+
+    def coverage(self, method: dict, language: Language) -> float:
+        """Scores a doc comment by its coverage of summary, parameters and return value."""
+        doc = clean_doc_comment(method.get("doc_comment"))
+        if not doc or _PLACEHOLDER_DOC.search(doc):
+            return 0.0
+
+        source_code = method.get("source_code") or ""
+        parameters = extract_parameters(source_code, language)
+        needs_return = has_return_value(source_code, language)
+
+        # Only a summary sentence of some substance counts; short notes still go to the LLM
+        summary = doc.split("\n\n", 1)[0]
+        covered = 1 if len(summary.split()) >= self.config.min_summary_words else 0
+        for parameter in parameters:
+            if re.search(rf"\b{re.escape(parameter)}\b", doc):
+                covered += 1
+        if needs_return and _RETURN_DOC.search(doc):
+            covered += 1
+        return covered / (1 + len(parameters) + (1 if needs_return else 0))
+
+    def template_documentation(self, method: dict, language: Language) -> Optional[str]:
+        """Returns generated documentation for trivial getters and setters, if the method is one.
+
+        Besides the name, the method must have an accessor's shape: a getter takes
+        no parameters and only returns a field; a setter takes one parameter and
+        only assigns it to a field.
+        """
+        name = method.get("name") or ""
+        source_code = method.get("source_code") or ""
+        lines = method.get("end_line", 0) - method.get("start_line", 0) + 1
+        match = _ACCESSOR_NAME.match(name)
+        if not match or lines > self.config.trivial_max_lines:
+            return None
+
+        parameters = extract_parameters(source_code, language)
+        statements = _body_statements(source_code)
+        if len(statements) != 1:
+            return None
+
+        prefix, attribute = match.group(1), match.group(2) or match.group(3)
+        attribute = attribute[0].lower() + attribute[1:]
+        if prefix == "set":
+            if len(parameters) != 1 or not re.match(rf"^{_FIELD}\s*=\s*{re.escape(parameters[0])}$", statements[0]):
+                return None
+            return f"Sets the `{attribute}` property to the given value."
+        if parameters or not _GETTER_BODY.match(statements[0]):
+            return None
+        if prefix in ("is", "has"):
+            return f"Returns whether the object {prefix} `{attribute}`."
+        return f"Returns the `{attribute}` property."
+
+    def decide(self, method: dict, language: Language) -> PrefilterDecision:
+        if not self.config.enabled:
+            return PrefilterDecision("full")
+
+        template = self.template_documentation(method, language)
+        if template:
+            return PrefilterDecision("template", documentation=template)
+
+        coverage = self.coverage(method, language)
+        if coverage >= self.config.skip_threshold:
+            return PrefilterDecision("skip", coverage, clean_doc_comment(method.get("doc_comment")))
+        if coverage >= self.config.refine_threshold:
+            return PrefilterDecision("refine", coverage)
+        return PrefilterDecision("full", coverage)
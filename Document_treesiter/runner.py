@@ -0,0 +1,247 @@
+from typing import Optional, List, Tuple
+from llm import LLM
+from journal import RunJournal
+from writers import OutputStage
+from search_index import DocIndex, source_hash
+from scheduler import PriorityScheduler, WorkItem, estimate_tokens
+from prefilter import DocPrefilter
+from symbols import SymbolGraph
+from cache import TwoLevelCache, get_cache, content_key
+
+def is_failed_documentation(documentation: Optional[str]) -> bool:
+    return not documentation or documentation.startswith(("Error:", "Failed"))
+
+def is_settled_documentation(documentation: Optional[str]) -> bool:
+    """Whether documentation was actually produced this run (not failed or cut off by a budget)."""
+    return not is_failed_documentation(documentation) and not documentation.startswith("Skipped:")
+
+def previous_row(rows: List[dict], method: dict) -> Optional[dict]:
+    """Finds the indexed row of a method: same source, else same position, else the only one of that name."""
+    named = [row for row in rows if row["name"] == method.get("name")]
+    current_hash = source_hash(method.get("source_code"))
+    for row in named:
+        if row["source_hash"] == current_hash:
+            return row
+    for row in named:
+        if row["start_line"] == method.get("start_line"):
+            return row
+    return named[0] if len(named) == 1 else None
+
+class DocumentationRun:
+    """Documents the methods extracted from a repository in priority order.
+
+    Finished methods are journaled as they complete; once every method of a
+    file is settled, the file is handed to the output stage and the search index.
+    """
+
+    def __init__(self, llm: LLM, repo: str, journal: Optional[RunJournal], doc_index: DocIndex,
+                 scheduler: PriorityScheduler, output_stage: Optional[OutputStage] = None,
+                 prefilter: Optional[DocPrefilter] = None, symbol_graph: Optional[SymbolGraph] = None,
+                 context_tokens: int = 200, partial_files: bool = False,
+                 cache: Optional[TwoLevelCache] = None, include_source: bool = False,
+                 reuse_unchanged: bool = False):
+        self.llm = llm
+        self.repo = repo
+        self.journal = journal
+        self.doc_index = doc_index
+        self.scheduler = scheduler
+        self.output_stage = output_stage
+        self.prefilter = prefilter or DocPrefilter()
+        self.symbol_graph = symbol_graph
+        self.context_tokens = context_tokens
+        # Diff runs only see the touched methods of each file
+        self.partial_files = partial_files
+        self.cache = cache or get_cache()
+        # Method source is only added to the results when a client opts in
+        self.include_source = include_source
+        # Methods whose source matches their indexed row keep that documentation
+        self.reuse_unchanged = reuse_unchanged
+        self.stats = {
+            "processed": 0, "failed": 0, "resumed": 0, "skipped": 0,
+            "existing_docs": 0, "templated": 0, "refined": 0, "cached": 0, "unchanged": 0
+        }
+
+        self._entries = []
+        self._extracted = []
+        self._pending = []
+
+    def add_file(self, file_info: dict):
+        """Registers an extracted file and queues the methods that still need the LLM."""
+        language = file_info["language"]
+        entry = {
+            "file_path": file_info["file_path"],
+            "language": language.value,
+            "methods": [None] * len(file_info.get("methods", []))
+        }
+        if "error" in file_info:
+            entry["error"] = file_info["error"]
+
+        file_index = len(self._entries)
+        self._entries.append(entry)
+        self._extracted.append(file_info)
+        self._pending.append(0)
+
+        previous = self.doc_index.file_methods(self.repo, file_info["file_path"]) if self.reuse_unchanged else []
+        for index, method in enumerate(file_info.get("methods", [])):
+            row = previous_row(previous, method) if previous else None
+            if row and row["documentation"] and row["source_hash"] == source_hash(method.get("source_code")):
+                self.stats["unchanged"] += 1
+                self._set_documentation(file_index, index, row["documentation"])
+                continue
+
+            journaled_doc = self.journal.get(file_info["file_path"], method) if self.journal is not None else None
+            if journaled_doc is not None:
+                self.stats["resumed"] += 1
+                self._set_documentation(file_index, index, journaled_doc)
+                continue
+
+            decision = self.prefilter.decide(method, language)
+            if decision.action in ("skip", "template"):
+                self.stats["existing_docs" if decision.action == "skip" else "templated"] += 1
+                self._set_documentation(file_index, index, decision.documentation)
+                continue
+
+            self._pending[file_index] += 1
+            self.scheduler.push(WorkItem(file_info["file_path"], language, method,
+                                         file_index=file_index, method_index=index,
+                                         refine=decision.action == "refine"))
+
+        if self._pending[file_index] == 0:
+            self._finish_file(file_index)
+
+    def next_item(self) -> Optional[WorkItem]:
+        """Returns the next method to document, with its cross-method context attached."""
+        item = self.scheduler.pop()
+        if item and self.symbol_graph and not item.refine:
+            # Built at dispatch time so pipelined runs see as much of the graph as possible
+            item.context = self.symbol_graph.context_for(item.file_path, item.method, self.context_tokens)
+            self.scheduler.tokens_used += estimate_tokens(item.context)
+        return item
+
+    def _set_documentation(self, file_index: int, method_index: int, documentation: str):
+        method = self._extracted[file_index]["methods"][method_index]
+        method_doc = {
+            "name": method["name"],
+            "start_line": method.get("start_line"),
+            "end_line": method.get("end_line"),
+            "documentation": documentation
+        }
+        if self.include_source:
+            method_doc["source_code"] = method.get("source_code")
+        self._entries[file_index]["methods"][method_index] = method_doc
+
+    def generate(self, item: WorkItem) -> Tuple[Optional[str], bool]:
+        """Produces the documentation of one work item and whether it came from the cache.
+
+        Safe to call from worker threads; bookkeeping happens in complete().
+        """
+        method = item.method
+        # Identical prompts produce reusable documentation across runs and workers
+        cache_key = self._cache_key(item)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached, True
+
+        try:
+            doc = self.llm.generate_structured_documentation(
+                item.language.value, [dict(method, context=item.context)], refine=item.refine
+            )
+            documentation = doc.get(method["name"]) if doc and not isinstance(doc, str) else None
+        except Exception as e:
+            print(f"Error processing method {method['name']}: {str(e)}")
+            documentation = f"Error: {str(e)}"
+
+        if not is_failed_documentation(documentation):
+            self.cache.set(cache_key, documentation)
+        return documentation, False
+
+    def _cache_key(self, item: WorkItem) -> str:
+        method = item.method
+        return content_key(
+            "doc", self.llm.model, item.language.value, item.refine,
+            method["name"], method.get("source_code"), method.get("doc_comment"), item.context
+        )
+
+    def complete(self, item: WorkItem, documentation: Optional[str], cached: bool = False):
+        """Records the documentation generated for a work item."""
+        if cached:
+            self.stats["cached"] += 1
+        elif is_failed_documentation(documentation):
+            self.stats["failed"] += 1
+        else:
+            self.stats["processed"] += 1
+            if item.refine:
+                self.stats["refined"] += 1
+        if not is_failed_documentation(documentation) and self.journal is not None:
+            self.journal.record(item.file_path, item.method, documentation)
+
+        self._set_documentation(item.file_index, item.method_index,
+                                documentation or "Failed to generate documentation")
+        self._pending[item.file_index] -= 1
+        if self._pending[item.file_index] == 0:
+            self._finish_file(item.file_index)
+
+    def _finish_file(self, file_index: int):
+        entry = self._entries[file_index]
+        previous = self.doc_index.file_methods(self.repo, entry["file_path"])
+
+        indexed_methods, output_methods = [], []
+        missing = False
+        for method, method_doc in zip(self._extracted[file_index].get("methods", []), entry["methods"]):
+            documentation = method_doc["documentation"]
+            if is_settled_documentation(documentation):
+                indexed_methods.append(dict(method, documentation=documentation))
+                output_methods.append(method_doc)
+                continue
+
+            # Methods that failed or were cut off keep their earlier documentation and
+            # old source hash, so the next run still treats a changed method as changed
+            row = previous_row(previous, method)
+            if row and row["documentation"]:
+                indexed_methods.append(dict(method, documentation=row["documentation"], source_hash=row["source_hash"]))
+                output_methods.append(dict(method_doc, documentation=row["documentation"]))
+            else:
+                indexed_methods.append(dict(method, documentation=None, source_hash=None))
+                output_methods.append(method_doc)
+                missing = True
+
+        # Partial entries would replace a file's full documentation with the touched methods only,
+        # and a file written before is left as it is rather than losing methods to failures
+        if self.output_stage and not self.partial_files and not (missing and previous):
+            self.output_stage.submit(dict(entry, methods=output_methods))
+
+        self.doc_index.update_file(self.repo, entry["file_path"], entry["language"], indexed_methods,
+                                   replace_file=not self.partial_files)
+
+    def finish(self) -> dict:
+        """Marks everything the budget cut off as skipped and returns the results and stats."""
+        unfinished = set()
+        for item in self.scheduler.drain():
+            self.stats["skipped"] += 1
+            self._set_documentation(item.file_index, item.method_index,
+                                    f"Skipped: {self.scheduler.exhausted_reason}")
+            unfinished.add(item.file_index)
+        for file_index in sorted(unfinished):
+            self._finish_file(file_index)
+
+        result = {"files": self._entries, "stats": self.stats}
+        if self.scheduler.exhausted_reason:
+            result["budget"] = {
+                "exhausted": self.scheduler.exhausted_reason,
+                "tokens_used": self.scheduler.tokens_used
+            }
+        return result
+
+    def run(self, files: List[dict]) -> dict:
+        """Documents the extracted files one method at a time and returns the results and stats."""
+        for file_info in files:
+            self.add_file(file_info)
+
+        while True:
+            item = self.next_item()
+            if item is None:
+                break
+            documentation, cached = self.generate(item)
+            self.complete(item, documentation, cached)
+
+        return self.finish()
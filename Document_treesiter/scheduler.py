@@ -0,0 +1,167 @@
+import re
+import math
+import time
+import heapq
+import fnmatch
+import itertools
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional, Dict, List, Set
+from constants import Language
+from search_index import source_hash
+from prefilter import method_signature
+
+# Rough size of the method prompt template around the method itself
+PROMPT_OVERHEAD_TOKENS = 150
+
+DEFAULT_WEIGHTS = {
+    "changed": 4.0,
+    "path": 3.0,
+    "public": 2.0,
+    "callers": 1.0,
+    "size": 0.5
+}
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate of roughly four characters per token."""
+    return len(text or "") // 4 + 1
+
+def is_public(name: str, source_code: str, language: Language) -> bool:
+    """Heuristically decides whether a method is part of the public/exported API."""
+    header = (source_code or "").split("\n", 1)[0]
+    if language == Language.PYTHON:
+        return not name.startswith("_")
+    if language == Language.GO:
+        return name[:1].isupper()
+    if language == Language.RUST:
+        return header.lstrip().startswith("pub")
+    if language in (Language.JAVASCRIPT, Language.TYPESCRIPT):
+        return header.lstrip().startswith("export")
+    if language in (Language.C, Language.CPP):
+        return not header.lstrip().startswith("static")
+    if language == Language.KOTLIN:
+        return not re.search(r"\b(private|internal|protected)\b", header)
+    return bool(re.search(r"\bpublic\b", header))
+
+@dataclass
+class WorkItem:
+    file_path: str
+    language: Language
+    method: dict
+    file_index: int = 0
+    method_index: int = 0
+    priority: float = 0.0
+    refine: bool = False
+    context: str = ""
+
+    @property
+    def estimated_tokens(self) -> int:
+        source_code = self.method.get("source_code")
+        if self.refine:
+            source_code = method_signature(source_code)
+        return (PROMPT_OVERHEAD_TOKENS + estimate_tokens(source_code)
+                + estimate_tokens(self.method.get("doc_comment")) + estimate_tokens(self.context))
+
+@dataclass
+class SchedulerConfig:
+    weights: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_WEIGHTS))
+    path_patterns: List[str] = field(default_factory=list)
+    time_budget: Optional[float] = None
+    token_budget: Optional[int] = None
+
+    @classmethod
+    def from_request(cls, options: Optional[dict]) -> "SchedulerConfig":
+        """Builds a config from the optional "priority" object of a /process request."""
+        options = options or {}
+        weights = dict(DEFAULT_WEIGHTS)
+        for signal, weight in (options.get("weights") or {}).items():
+            if signal not in DEFAULT_WEIGHTS:
+                raise ValueError(f"Unknown priority signal: {signal}")
+            weights[signal] = float(weight)
+        return cls(
+            weights=weights,
+            path_patterns=list(options.get("path_patterns") or []),
+            time_budget=float(options["time_budget"]) if options.get("time_budget") is not None else None,
+            token_budget=int(options["token_budget"]) if options.get("token_budget") is not None else None
+        )
+
+class PriorityScheduler:
+    """Orders documentation work by configurable signals and enforces time/token budgets.
+
+    Signals are normalised to [0, 1] and combined with the configured weights;
+    a negative weight inverts a signal (e.g. prefer small methods).
+    """
+
+    def __init__(self, config: SchedulerConfig = None, previous_hashes: Dict[tuple, Set[str]] = None,
+                 caller_counts: Counter = None):
+        self.config = config or SchedulerConfig()
+        self.previous_hashes = previous_hashes or {}
+        self.caller_counts = caller_counts or Counter()
+        self._max_callers = max(self.caller_counts.values(), default=0)
+        self._heap = []
+        self._sequence = itertools.count()
+        self._over_budget: List[WorkItem] = []
+        self._started = None
+        self.tokens_used = 0
+        self.exhausted_reason: Optional[str] = None
+
+    def signals(self, item: WorkItem) -> Dict[str, float]:
+        method = item.method
+        name = method.get("name", "")
+        source_code = method.get("source_code") or ""
+
+        previous = self.previous_hashes.get((item.file_path, name), ())
+        callers = self.caller_counts.get(name, 0)
+        lines = method.get("end_line", 0) - method.get("start_line", 0) + 1
+
+        return {
+            "changed": 1.0 if source_hash(source_code) not in previous else 0.0,
+            "path": 1.0 if any(fnmatch.fnmatch(item.file_path, p) for p in self.config.path_patterns) else 0.0,
+            "public": 1.0 if is_public(name, source_code, item.language) else 0.0,
+            "callers": math.log1p(callers) / math.log1p(self._max_callers) if self._max_callers else 0.0,
+            "size": min(lines / 100.0, 1.0)
+        }
+
+    def score(self, item: WorkItem) -> float:
+        signals = self.signals(item)
+        return sum(self.config.weights.get(name, 0.0) * value for name, value in signals.items())
+
+    def push(self, item: WorkItem):
+        item.priority = self.score(item)
+        heapq.heappush(self._heap, (-item.priority, next(self._sequence), item))
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def pop(self) -> Optional[WorkItem]:
+        """Returns the highest priority item that still fits the budgets, or None when done.
+
+        Items too large for the remaining token budget are set aside so that
+        smaller, lower priority items can still use it.
+        """
+        if self._started is None:
+            self._started = time.monotonic()
+
+        while self._heap:
+            if (self.config.time_budget is not None
+                    and time.monotonic() - self._started >= self.config.time_budget):
+                self.exhausted_reason = "time budget exhausted"
+                return None
+
+            item = heapq.heappop(self._heap)[2]
+            if (self.config.token_budget is not None
+                    and self.tokens_used + item.estimated_tokens > self.config.token_budget):
+                self.exhausted_reason = "token budget exhausted"
+                self._over_budget.append(item)
+                continue
+
+            self.tokens_used += item.estimated_tokens
+            return item
+        return None
+
+    def drain(self) -> List[WorkItem]:
+        """Removes and returns every item that was not dispatched."""
+        items = self._over_budget + [entry[2] for entry in sorted(self._heap)]
+        self._heap = []
+        self._over_budget = []
+        return items
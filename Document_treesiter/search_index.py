@@ -0,0 +1,155 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Optional, Dict, List, Set
+
+DEFAULT_INDEX_PATH = os.getenv("DOCE_INDEX_PATH", ".doce_index.sqlite3")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS methods (
+    id INTEGER PRIMARY KEY,
+    repo TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    name TEXT NOT NULL,
+    start_line INTEGER,
+    end_line INTEGER,
+    language TEXT,
+    doc_comment TEXT,
+    documentation TEXT,
+    source_hash TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_methods_name ON methods(name);
+CREATE INDEX IF NOT EXISTS idx_methods_file ON methods(repo, file_path);
+CREATE VIRTUAL TABLE IF NOT EXISTS methods_fts USING fts5(
+    name, doc_comment, documentation,
+    content='methods', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS methods_ai AFTER INSERT ON methods BEGIN
+    INSERT INTO methods_fts(rowid, name, doc_comment, documentation)
+    VALUES (new.id, new.name, new.doc_comment, new.documentation);
+END;
+CREATE TRIGGER IF NOT EXISTS methods_ad AFTER DELETE ON methods BEGIN
+    INSERT INTO methods_fts(methods_fts, rowid, name, doc_comment, documentation)
+    VALUES ('delete', old.id, old.name, old.doc_comment, old.documentation);
+END;
+"""
+
+_COLUMNS = ("repo", "file_path", "name", "start_line", "end_line", "language", "doc_comment", "documentation")
+
+def source_hash(source_code: str) -> str:
+    """Returns a stable hash of a method's source code."""
+    return hashlib.sha1((source_code or "").encode("utf-8")).hexdigest()
+
+def _fts_query(query: str) -> str:
+    """Quotes every term so user input cannot break the FTS5 query syntax."""
+    terms = ['"' + term.replace('"', '""') + '"' for term in query.split()]
+    return " ".join(terms)
+
+class DocIndex:
+    """Persistent SQLite FTS5 index over extracted methods and their generated documentation."""
+
+    def __init__(self, path: str = None):
+        self.path = path or DEFAULT_INDEX_PATH
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def update_file(self, repo: str, file_path: str, language: str, methods: List[dict],
+                    replace_file: bool = True):
+        """Replaces the indexed methods of one file with the given ones.
+
+        With replace_file=False only methods sharing a name with the given ones
+        are replaced, which suits runs that only saw part of the file.
+        """
+        now = time.time()
+        rows = [
+            (
+                repo, file_path, method["name"], method.get("start_line"), method.get("end_line"),
+                language, method.get("doc_comment"), method.get("documentation"),
+                # An explicit source_hash (possibly None) carries over a previously indexed row
+                method["source_hash"] if "source_hash" in method else source_hash(method.get("source_code")),
+                now
+            )
+            for method in methods if method.get("name")
+        ]
+        with self._lock, self._conn:
+            if replace_file:
+                self._conn.execute("DELETE FROM methods WHERE repo = ? AND file_path = ?", (repo, file_path))
+            else:
+                self._conn.executemany(
+                    "DELETE FROM methods WHERE repo = ? AND file_path = ? AND name = ?",
+                    [(repo, file_path, name) for name in {row[2] for row in rows}]
+                )
+            self._conn.executemany(
+                "INSERT INTO methods (repo, file_path, name, start_line, end_line, language, "
+                "doc_comment, documentation, source_hash, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+
+    def file_methods(self, repo: str, file_path: str) -> List[dict]:
+        """Returns the indexed methods of one file with their documentation and source hash."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, start_line, documentation, source_hash FROM methods "
+                "WHERE repo = ? AND file_path = ? ORDER BY start_line",
+                (repo, file_path)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def source_hashes(self, repo: str) -> Dict[tuple, Set[str]]:
+        """Returns the source hashes of the indexed methods of a repository keyed by (file_path, name).
+
+        Overloads share a name, so each key holds the hashes of all of them; a
+        method is unchanged if its hash is in the set, wherever it moved in the file.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT file_path, name, source_hash FROM methods WHERE repo = ? AND source_hash IS NOT NULL",
+                (repo,)
+            ).fetchall()
+        hashes: Dict[tuple, Set[str]] = {}
+        for row in rows:
+            hashes.setdefault((row["file_path"], row["name"]), set()).add(row["source_hash"])
+        return hashes
+
+    def search(self, query: Optional[str] = None, name_prefix: Optional[str] = None,
+               repo: Optional[str] = None, limit: int = 20) -> List[dict]:
+        """Full-text search over names and documentation, optionally narrowed by name prefix and repo."""
+        conditions, params = [], []
+        if name_prefix:
+            # A range over the name index is much faster than LIKE for prefixes
+            conditions.append("m.name >= ? AND m.name < ?")
+            params.extend([name_prefix, name_prefix + "\U0010ffff"])
+        if repo:
+            conditions.append("m.repo = ?")
+            params.append(repo)
+
+        columns = ", ".join(f"m.{column}" for column in _COLUMNS)
+        if query and _fts_query(query):
+            sql = (f"SELECT {columns} FROM methods_fts JOIN methods m ON m.id = methods_fts.rowid "
+                   f"WHERE methods_fts MATCH ?")
+            params.insert(0, _fts_query(query))
+            if conditions:
+                sql += " AND " + " AND ".join(conditions)
+            sql += " ORDER BY bm25(methods_fts)"
+        else:
+            sql = f"SELECT {columns} FROM methods m"
+            if conditions:
+                sql += " WHERE " + " AND ".join(conditions)
+            sql += " ORDER BY m.name"
+        sql += " LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [dict(row) for row in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
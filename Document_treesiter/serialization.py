@@ -0,0 +1,81 @@
+import json
+import gzip
+import time
+from typing import Optional, Any
+from flask import Response
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+# Bodies smaller than this are not worth the compression overhead
+MIN_COMPRESS_SIZE = 1024
+
+def dumps(payload: Any) -> bytes:
+    """Serializes to compact JSON, using orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """Picks the best supported content coding from an Accept-Encoding header."""
+    offered = {}
+    for part in (accept_encoding or "").split(","):
+        pieces = part.strip().split(";")
+        coding = pieces[0].strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for parameter in pieces[1:]:
+            name, _, value = parameter.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        offered[coding] = quality
+
+    supported = ["zstd", "gzip"] if ZSTD_AVAILABLE else ["gzip"]
+    candidates = [
+        coding for coding in supported
+        if offered.get(coding, offered.get("*", 0.0)) > 0
+    ]
+    # Ties keep the server preference order (zstd compresses faster at a similar ratio)
+    return max(candidates, key=lambda coding: offered.get(coding, offered.get("*", 0.0)), default=None)
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(body)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=5)
+    raise ValueError(f"Unsupported content encoding: {encoding}")
+
+def json_response(payload: Any, status: int = 200, accept_encoding: Optional[str] = None) -> Response:
+    """Builds a compact JSON response, compressed with the best coding the client accepts."""
+    start = time.perf_counter()
+    body = dumps(payload)
+    serialize_ms = (time.perf_counter() - start) * 1000
+
+    headers = {"Vary": "Accept-Encoding"}
+    timings = [f"serialize;dur={serialize_ms:.2f}"]
+    encoding = negotiate_encoding(accept_encoding) if len(body) >= MIN_COMPRESS_SIZE else None
+    if encoding:
+        start = time.perf_counter()
+        uncompressed_size = len(body)
+        body = compress(body, encoding)
+        timings.append(f"compress;dur={(time.perf_counter() - start) * 1000:.2f}")
+        headers["Content-Encoding"] = encoding
+        headers["X-Uncompressed-Length"] = str(uncompressed_size)
+    headers["Server-Timing"] = ", ".join(timings)
+
+    return Response(body, status=status, mimetype="application/json", headers=headers)
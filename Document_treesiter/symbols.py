@@ -0,0 +1,148 @@
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from typing import Optional, Dict, List, Iterable, Tuple
+from prefilter import method_signature, clean_doc_comment
+from scheduler import estimate_tokens
+
+CALL_PATTERN = re.compile(r"\b([A-Za-z_]\w*)\s*\(")
+
+# Keywords that look like calls, e.g. "if (" or "while ("
+_CALL_KEYWORDS = {"if", "for", "while", "switch", "catch", "return", "sizeof", "elif", "and", "or", "not", "with"}
+
+@dataclass
+class Symbol:
+    name: str
+    file_path: str
+    class_name: Optional[str]
+    signature: str
+    summary: str
+    start_line: int = 0
+
+    @property
+    def key(self) -> Tuple[str, str, int]:
+        return self.file_path, self.name, self.start_line
+
+    def describe(self) -> str:
+        line = self.signature.replace("\n", " ")
+        return f"{line}  -- {self.summary}" if self.summary else line
+
+def _summary(doc_comment: Optional[str]) -> str:
+    """Returns the first sentence of a doc comment."""
+    doc = clean_doc_comment(doc_comment)
+    if not doc:
+        return ""
+    first_line = doc.split("\n\n", 1)[0].replace("\n", " ").strip()
+    return first_line.split(". ", 1)[0].rstrip(".")[:160]
+
+class SymbolGraph:
+    """Repository-wide symbol table and call graph built from the extracted methods.
+
+    Calls are resolved by name, preferring a method of the same class, then one
+    in the same file, then a unique definition anywhere in the repository.
+    """
+
+    def __init__(self):
+        self._by_name: Dict[str, List[Symbol]] = defaultdict(list)
+        self._by_class: Dict[Tuple[str, str], List[Symbol]] = defaultdict(list)
+        self._symbols: Dict[Tuple[str, str, int], Symbol] = {}
+        self._calls: Dict[Tuple[str, str, int], List[str]] = {}
+
+    @classmethod
+    def build(cls, files: Iterable[dict]) -> "SymbolGraph":
+        graph = cls()
+        for file_info in files:
+            graph.add_file(file_info)
+        return graph
+
+    def add_file(self, file_info: dict):
+        file_path = file_info["file_path"]
+        for method in file_info.get("methods", []):
+            symbol = Symbol(
+                name=method["name"],
+                file_path=file_path,
+                class_name=method.get("class_name"),
+                signature=method_signature(method.get("source_code")),
+                summary=_summary(method.get("doc_comment")),
+                start_line=method.get("start_line", 0)
+            )
+            self._symbols[symbol.key] = symbol
+            self._by_name[symbol.name].append(symbol)
+            if symbol.class_name:
+                self._by_class[(file_path, symbol.class_name)].append(symbol)
+
+            # The declaration itself matches the call pattern, so drop the first self-match
+            calls = CALL_PATTERN.findall(method.get("source_code") or "")
+            if symbol.name in calls:
+                calls.remove(symbol.name)
+            self._calls[symbol.key] = [name for name in dict.fromkeys(calls) if name not in _CALL_KEYWORDS]
+
+    def resolve(self, name: str, file_path: str, class_name: Optional[str] = None) -> Optional[Symbol]:
+        candidates = self._by_name.get(name)
+        if not candidates:
+            return None
+        if class_name:
+            for symbol in candidates:
+                if symbol.file_path == file_path and symbol.class_name == class_name:
+                    return symbol
+        for symbol in candidates:
+            if symbol.file_path == file_path:
+                return symbol
+        return candidates[0] if len(candidates) == 1 else None
+
+    def callees(self, file_path: str, method: dict) -> List[Symbol]:
+        key = (file_path, method["name"], method.get("start_line", 0))
+        callees = []
+        for name in self._calls.get(key, []):
+            symbol = self.resolve(name, file_path, method.get("class_name"))
+            if symbol and symbol.key != key:
+                callees.append(symbol)
+        return callees
+
+    def caller_counts(self) -> Counter:
+        """Counts resolved call sites per method name across the repository."""
+        counts = Counter()
+        for key, calls in self._calls.items():
+            caller = self._symbols[key]
+            for name in calls:
+                symbol = self.resolve(name, caller.file_path, caller.class_name)
+                if symbol and symbol.key != key:
+                    counts[symbol.name] += 1
+        return counts
+
+    def context_for(self, file_path: str, method: dict, max_tokens: int = 200) -> str:
+        """Builds a compact prompt section with the enclosing class and callee signatures.
+
+        Lines are added in order of usefulness until max_tokens would be exceeded.
+        """
+        lines = []
+        used = 0
+
+        def add(line: str) -> bool:
+            nonlocal used
+            cost = estimate_tokens(line)
+            if used + cost > max_tokens:
+                return False
+            lines.append(line)
+            used += cost
+            return True
+
+        callees = self.callees(file_path, method)
+        for symbol in callees:
+            if not add(f"- calls {symbol.describe()}"):
+                break
+
+        class_name = method.get("class_name")
+        if class_name:
+            siblings = [
+                symbol for symbol in self._by_class.get((file_path, class_name), [])
+                if symbol.name != method["name"]
+            ]
+            if add(f"- enclosing class {class_name} with {len(siblings)} other methods"):
+                for symbol in siblings:
+                    if symbol in callees:
+                        continue
+                    if not add(f"  - {symbol.describe()}"):
+                        break
+
+        return "\n".join(lines)
@@ -0,0 +1,13 @@
+import os
+import sys
+import tempfile
+
+# The app modules live flat in Document_treesiter/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Module-level defaults are read at import time, so keep them out of the working tree
+_state_dir = tempfile.mkdtemp(prefix="doce-tests-")
+os.environ.setdefault("GEMINI_API_KEY", "test-key")
+os.environ.setdefault("DOCE_CACHE_URL", "none")
+os.environ.setdefault("DOCE_INDEX_PATH", os.path.join(_state_dir, "index.sqlite3"))
+os.environ.setdefault("DOCE_JOURNAL_DIR", os.path.join(_state_dir, "runs"))
@@ -0,0 +1,23 @@
+import pytest
+from admission import FairAdmission, AdmissionConfig, QueueFullError
+
+def test_idle_clients_are_forgotten():
+    admission = FairAdmission(AdmissionConfig(max_concurrency=2))
+    for client in ("a", "b", "c"):
+        with admission.slot(client):
+            assert client in admission._last_finish
+    assert admission._last_finish == {}
+    assert admission.stats()["tracked_clients"] == 0
+
+def test_timed_out_client_is_forgotten():
+    admission = FairAdmission(AdmissionConfig(max_concurrency=1, max_wait=0.05))
+    with admission.slot("a"):
+        with pytest.raises(QueueFullError):
+            admission.acquire("b")
+    assert "b" not in admission._last_finish
+
+def test_api_keys_are_read_from_env(monkeypatch):
+    monkeypatch.setenv("DOCE_API_KEYS", "alpha, beta")
+    admission = FairAdmission(AdmissionConfig.from_env())
+    assert admission.is_known_key("alpha") and admission.is_known_key("beta")
+    assert not admission.is_known_key("gamma")
@@ -0,0 +1,47 @@
+import time
+from cache import TwoLevelCache, RedisBackend, SQLiteBackend, LocalKVClient, LRUCache, content_key
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.metrics.to_dict()["evictions"] == 1
+
+def test_shared_tier_hits_are_promoted_to_the_local_tier():
+    client = LocalKVClient()
+    writer = TwoLevelCache(RedisBackend(client))
+    writer.set("key", {"documentation": "text"})
+
+    # A second process shares only the backend
+    reader = TwoLevelCache(RedisBackend(client))
+    assert reader.get("key") == {"documentation": "text"}
+    assert reader.get("key") == {"documentation": "text"}
+    stats = reader.stats()
+    assert stats["redis"]["hits"] == 1
+    assert stats["local"]["misses"] == 1 and stats["local"]["hits"] == 1
+
+def test_misses_are_counted_in_both_tiers():
+    cache = TwoLevelCache(RedisBackend(LocalKVClient()))
+    assert cache.get("missing") is None
+    stats = cache.stats()
+    assert stats["local"]["misses"] == 1 and stats["redis"]["misses"] == 1
+
+def test_local_kv_entries_expire(monkeypatch):
+    client = LocalKVClient()
+    client.set("key", b"value", ex=10)
+    now = time.time()
+    monkeypatch.setattr("cache.time.time", lambda: now + 11)
+    assert client.get("key") is None
+
+def test_sqlite_backend_survives_reopen(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    TwoLevelCache(SQLiteBackend(path)).set("key", [1, 2])
+    assert TwoLevelCache(SQLiteBackend(path)).get("key") == [1, 2]
+
+def test_content_key_separates_parts():
+    assert content_key("parse", "ab", "c") != content_key("parse", "a", "bc")
+    assert content_key("parse", 1, "x") != content_key("parse", 2, "x")
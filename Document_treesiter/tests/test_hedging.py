@@ -0,0 +1,95 @@
+import time
+import threading
+import pytest
+
+pytest.importorskip("requests")
+
+from hedging import HedgePolicy, LatencyTracker, HedgeBudget
+from llm import LLM
+
+class FakeResponse:
+    status_code = 200
+
+    def __init__(self, text: str):
+        self.text = text
+
+    def json(self):
+        return {"candidates": [{"content": {"parts": [{"text": self.text}]}}]}
+
+    def raise_for_status(self):
+        pass
+
+def fake_post(delays: dict):
+    """Answers with the model name after the delay configured for that model."""
+    calls = []
+    lock = threading.Lock()
+
+    def post(url, **kwargs):
+        model = url.rsplit("/", 1)[1].split(":")[0]
+        with lock:
+            calls.append(model)
+        time.sleep(delays[model])
+        return FakeResponse(model)
+
+    return post, calls
+
+def _llm(**policy) -> LLM:
+    return LLM(api_key="test", model="primary", hedge_policy=HedgePolicy(enabled=True, **policy))
+
+def test_hedge_fires_after_the_delay_and_the_first_success_wins(monkeypatch):
+    post, calls = fake_post({"primary": 1.0, "fallback": 0.01})
+    monkeypatch.setattr("llm.requests.post", post)
+    llm = _llm(initial_delay=0.05, max_hedge_rate=1.0, fallback_model="fallback")
+
+    start = time.monotonic()
+    assert llm.call_gemini_api("prompt") == "fallback"
+    assert time.monotonic() - start < 0.5
+    assert calls == ["primary", "fallback"]
+    assert llm.hedge_budget.to_dict()["hedge_wins"] == 1
+
+def test_fast_primary_is_not_hedged(monkeypatch):
+    post, calls = fake_post({"primary": 0.0, "fallback": 0.0})
+    monkeypatch.setattr("llm.requests.post", post)
+    llm = _llm(initial_delay=0.5, max_hedge_rate=1.0, fallback_model="fallback")
+
+    assert llm.call_gemini_api("prompt") == "primary"
+    assert calls == ["primary"]
+    assert llm.hedge_budget.to_dict()["hedges"] == 0
+
+def test_hedge_rate_is_capped(monkeypatch):
+    post, calls = fake_post({"primary": 0.05})
+    monkeypatch.setattr("llm.requests.post", post)
+    llm = _llm(initial_delay=0.01, max_hedge_rate=0.25)
+
+    for _ in range(8):
+        llm.call_gemini_api("prompt")
+    budget = llm.hedge_budget.to_dict()
+    assert budget["requests"] == 8
+    assert budget["hedges"] == 2
+    assert budget["hedge_rate"] <= 0.25
+
+def test_hedge_delay_follows_the_latency_percentile():
+    llm = _llm(percentile=95.0, min_samples=20, initial_delay=7.0, min_delay=0.0)
+    assert llm.hedge_delay() == 7.0
+    for latency in range(1, 101):
+        llm.latencies.record("primary", latency / 100)
+    assert llm.hedge_delay() == pytest.approx(0.96)
+
+def test_latency_tracker_reports_percentiles_per_provider():
+    tracker = LatencyTracker(window=100)
+    for latency in range(1, 201):
+        tracker.record("primary", float(latency))
+    tracker.record("fallback", 3.0)
+
+    stats = tracker.stats()
+    # Only the last 100 samples (101..200) are kept
+    assert stats["primary"] == {"samples": 100, "p50": 151.0, "p95": 196.0, "p99": 200.0}
+    assert stats["fallback"]["p99"] == 3.0
+
+def test_hedge_budget_never_exceeds_its_rate():
+    budget = HedgeBudget(max_rate=0.1)
+    granted = 0
+    for _ in range(100):
+        budget.record_request()
+        granted += budget.try_acquire()
+    assert granted == 10
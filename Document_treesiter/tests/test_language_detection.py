@@ -0,0 +1,58 @@
+import os
+import pytest
+from constants import Language
+from language_detection import detect_language, from_shebang, from_modeline, from_content
+
+@pytest.mark.parametrize("head, expected", [
+    (b"#!/usr/bin/env python3\n", Language.PYTHON),
+    (b"#!/usr/bin/python3.11\n", Language.PYTHON),
+    (b"#! /usr/bin/env node\n", Language.JAVASCRIPT),
+    (b"#!/usr/bin/env -S node --experimental-modules\n", Language.JAVASCRIPT),
+    (b"#!/usr/bin/env -i PATH=/bin ruby\n", Language.RUBY),
+    (b"#!/usr/bin/perl -w\n", Language.PERL),
+    (b"#!/usr/bin/env Rscript\n", Language.R),
+    (b"#!/bin/sh\n", None),
+    (b"#!/usr/bin/env\n", None),
+    (b"print('no shebang')\n", None),
+])
+def test_shebang(head, expected):
+    assert from_shebang(head) == expected
+
+@pytest.mark.parametrize("head, expected", [
+    (b"// vim: set ft=cpp:\nint f();\n", Language.CPP),
+    (b"int f();\n/* vim: filetype=objc */\n", Language.OBJECTIVE_C),
+    (b"// -*- C++ -*-\n", Language.CPP),
+    (b"/* -*- Mode: C++; tab-width: 4 -*- */\n", Language.CPP),
+    (b"/* -*- mode: objc -*- */\n", Language.OBJECTIVE_C),
+    (b"int f(void);\n", None),
+])
+def test_modeline(head, expected):
+    assert from_modeline(head) == expected
+
+@pytest.mark.parametrize("extension, head, expected", [
+    (".h", b"#import <Foundation/Foundation.h>\n@interface Foo : NSObject\n@end\n", Language.OBJECTIVE_C),
+    (".h", b"namespace util {\nclass Buffer {\npublic:\n};\n}\n", Language.CPP),
+    (".h", b"#include <vector>\nstd::vector<int> values();\n", Language.CPP),
+    (".h", b"#include <stdio.h>\nint f(void);\n", Language.C),
+    (".m", b"function y = square(x)\n% squares x\ny = x.^2;\nend\n", Language.MATLAB),
+    (".m", b"@implementation Foo\n- (void)bar {}\n@end\n", Language.OBJECTIVE_C),
+    (".m", b"", Language.OBJECTIVE_C),
+])
+def test_content_heuristics(extension, head, expected):
+    assert from_content(extension, head) == expected
+
+def test_detect_language(tmp_path):
+    header = tmp_path / "buffer.h"
+    header.write_bytes(b"template <typename T>\nclass Buffer {};\n")
+    script = tmp_path / "deploy"
+    script.write_bytes(b"#!/usr/bin/env python3\nprint('hi')\n")
+    os.chmod(script, 0o755)
+    notes = tmp_path / "NOTES"
+    notes.write_bytes(b"#!/usr/bin/env python3\n")
+
+    assert detect_language(str(header)) == Language.CPP
+    assert detect_language(str(script)) == Language.PYTHON
+    # Extensionless files that are not executable are not opened
+    assert detect_language(str(notes)) == Language.UNKNOWN
+    assert detect_language(str(tmp_path / "missing.go")) == Language.GO
+    assert detect_language("blob.h", b"\0\x01binary") == Language.UNKNOWN
@@ -0,0 +1,47 @@
+import time
+import pytest
+
+pytest.importorskip("tree_sitter")
+
+from cache import TwoLevelCache
+from pipeline import DocumentationPipeline, PipelineConfig, MAX_LLM_CONCURRENCY
+from runner import DocumentationRun
+from scheduler import PriorityScheduler
+from search_index import DocIndex
+
+class SlowLLM:
+    model = "slow"
+
+    def generate_structured_documentation(self, language, methods, refine=False):
+        time.sleep(0.01)
+        return {method["name"]: f"Documentation of {method['name']}." for method in methods}
+
+def test_slow_llm_limits_how_much_parsed_work_is_buffered(tmp_path):
+    for index in range(30):
+        (tmp_path / f"module_{index}.py").write_text(
+            f"def first_{index}(value):\n    return value + 1\n\n"
+            f"def second_{index}(value):\n    return value + 2\n"
+        )
+    run = DocumentationRun(SlowLLM(), str(tmp_path), None, DocIndex(str(tmp_path / "index.sqlite3")),
+                           PriorityScheduler(), cache=TwoLevelCache())
+    config = PipelineConfig(parse_workers=2, llm_concurrency=1, queue_size=2)
+
+    largest_backlog = 0
+    add_file = run.add_file
+
+    def tracking_add_file(file_info):
+        nonlocal largest_backlog
+        add_file(file_info)
+        largest_backlog = max(largest_backlog, len(run.scheduler))
+
+    run.add_file = tracking_add_file
+    result = DocumentationPipeline(run, config).execute(str(tmp_path))
+
+    assert result["stats"]["processed"] == 60
+    # At most one file (two methods) is taken in beyond the bound
+    assert largest_backlog <= config.max_pending_methods + 2
+
+def test_llm_concurrency_is_validated():
+    with pytest.raises(ValueError):
+        PipelineConfig.from_request({"llm_concurrency": MAX_LLM_CONCURRENCY + 1})
+    assert PipelineConfig.from_request({"llm_concurrency": 64}).llm_concurrency == 64
@@ -0,0 +1,59 @@
+import pytest
+from constants import Language
+from prefilter import DocPrefilter, extract_parameters
+
+def _method(doc_comment: str, source_code: str = "def flush():\n    pass\n") -> dict:
+    return {"name": "flush", "doc_comment": doc_comment, "source_code": source_code,
+            "start_line": 1, "end_line": 10}
+
+@pytest.mark.parametrize("doc_comment", [
+    "# TODO fix this",
+    "# FIXME: broken on Windows, see issue",
+    "# Copyright 2024 Example Corp. Licensed under the MIT License.",
+    "# Flush it."
+])
+def test_placeholder_or_short_comments_are_not_reused(doc_comment):
+    decision = DocPrefilter().decide(_method(doc_comment), Language.PYTHON)
+    assert decision.action == "full"
+
+def test_substantial_summary_is_reused():
+    decision = DocPrefilter().decide(_method("# Writes every pending record to disk."), Language.PYTHON)
+    assert decision.action == "skip"
+    assert decision.documentation == "Writes every pending record to disk."
+
+def test_go_method_receiver_is_not_a_parameter():
+    source = "func (s *Server) Handle(w http.ResponseWriter, r *http.Request) {\n}\n"
+    assert extract_parameters(source, Language.GO) == ["w", "r"]
+    assert extract_parameters("func Add(a int, b int) int {\n}\n", Language.GO) == ["a", "b"]
+
+def _accessor(name: str, source_code: str) -> dict:
+    return {"name": name, "doc_comment": None, "source_code": source_code,
+            "start_line": 1, "end_line": len(source_code.splitlines())}
+
+@pytest.mark.parametrize("language, name, source_code, documentation", [
+    (Language.PYTHON, "get_name", "def get_name(self):\n    return self._name\n", "Returns the `name` property."),
+    (Language.PYTHON, "get_name", "def get_name(self): return self.name\n", "Returns the `name` property."),
+    (Language.JAVA, "getCount", "public int getCount() {\n    return this.count;\n}",
+     "Returns the `count` property."),
+    (Language.JAVA, "setCount", "public void setCount(int count) {\n    this.count = count;\n}",
+     "Sets the `count` property to the given value."),
+    (Language.PYTHON, "is_active", "def is_active(self):\n    return self._active\n",
+     "Returns whether the object is `active`."),
+    (Language.GO, "getName", "func (s *Server) getName() string {\n\treturn s.name\n}",
+     "Returns the `name` property."),
+])
+def test_accessors_get_template_documentation(language, name, source_code, documentation):
+    decision = DocPrefilter().decide(_accessor(name, source_code), language)
+    assert decision.action == "template"
+    assert decision.documentation == documentation
+
+@pytest.mark.parametrize("language, name, source_code", [
+    (Language.PYTHON, "get_user", "def get_user(self, user_id):\n    return self.db.query(user_id).one()\n"),
+    (Language.PYTHON, "set_config", "def set_config(self, path):\n    self.cfg = json.load(open(path))\n"),
+    (Language.PYTHON, "is_valid", "def is_valid(self, token):\n    return verify(token, self.key)\n"),
+    (Language.JAVA, "getTotal", "public int getTotal() {\n    return a + b;\n}"),
+    (Language.JAVA, "setName", "public void setName(String name) {\n    log(name); this.name = name;\n}"),
+])
+def test_non_accessors_are_not_templated(language, name, source_code):
+    decision = DocPrefilter().decide(_accessor(name, source_code), language)
+    assert decision.action != "template"
@@ -0,0 +1,156 @@
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("tree_sitter")
+
+import flask_app
+from cache import TwoLevelCache
+from constants import Language
+
+class FakeLLM:
+    model = "fake"
+
+    def __init__(self):
+        self.calls = 0
+        self.fail = False
+
+    def generate_structured_documentation(self, language, methods, refine=False):
+        self.calls += 1
+        if self.fail:
+            return {method["name"]: "Failed to generate documentation: Error: quota" for method in methods}
+        return {method["name"]: f"Documentation of {method['name']}." for method in methods}
+
+    def latency_stats(self):
+        return {}
+
+def _method(name: str, start_line: int) -> dict:
+    return {
+        "name": name,
+        "doc_comment": None,
+        "source_code": f"def {name}(value):\n    return value * {start_line}\n",
+        "start_line": start_line,
+        "end_line": start_line + 1,
+        "class_name": None
+    }
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    source = tmp_path / "module.py"
+    source.write_text("")
+    extraction = {"files": [{
+        "file_path": str(source),
+        "language": Language.PYTHON,
+        "methods": [_method("scale", 1), _method("double", 4)]
+    }]}
+
+    fake_llm = FakeLLM()
+    monkeypatch.setattr(flask_app, "llm", fake_llm)
+    monkeypatch.setattr(flask_app, "extract_repository", lambda directory: extraction)
+    monkeypatch.setattr(flask_app, "doc_index", flask_app.DocIndex(str(tmp_path / "index.sqlite3")))
+    monkeypatch.setattr("journal.DEFAULT_JOURNAL_DIR", str(tmp_path / "runs"))
+    # A fresh in-process cache per test, so the second run cannot be served from it
+    monkeypatch.setattr("cache._default_cache", TwoLevelCache())
+    return flask_app.app.test_client(), fake_llm, tmp_path
+
+def test_same_run_id_resumes_without_llm_calls(client, monkeypatch):
+    test_client, fake_llm, tmp_path = client
+    request = {"directory": str(tmp_path), "run_id": "resume-test"}
+
+    first = test_client.post("/process", json=request).get_json()
+    assert first["stats"]["processed"] == 2
+    assert fake_llm.calls == 2
+    assert (tmp_path / "runs" / "resume-test.jsonl").stat().st_size > 0
+
+    monkeypatch.setattr("cache._default_cache", TwoLevelCache())
+    second = test_client.post("/process", json=request).get_json()
+    assert second["stats"]["resumed"] == 2
+    assert second["stats"]["processed"] == 0
+    assert fake_llm.calls == 2
+    assert [m["documentation"] for m in second["files"][0]["methods"]] == \
+        ["Documentation of scale.", "Documentation of double."]
+
+def test_diff_mode_rejects_output_dir(client):
+    test_client, fake_llm, tmp_path = client
+    response = test_client.post("/process", json={
+        "directory": str(tmp_path), "base_ref": "HEAD", "output_dir": str(tmp_path / "docs")
+    })
+    assert response.status_code == 400
+    assert fake_llm.calls == 0
+
+def test_pipelined_run_documents_every_method(client):
+    test_client, fake_llm, tmp_path = client
+    (tmp_path / "shapes.py").write_text(
+        "def area(width, height):\n    return width * height\n\n"
+        "def perimeter(width, height):\n    return 2 * (width + height)\n"
+    )
+    result = test_client.post("/process", json={
+        "directory": str(tmp_path), "pipeline": {"parse_workers": 2}
+    }).get_json()
+
+    documented = {m["name"]: m["documentation"] for f in result["files"] for m in f["methods"]}
+    assert documented == {"area": "Documentation of area.", "perimeter": "Documentation of perimeter."}
+    assert "pipeline_errors" not in result
+
+def test_unknown_api_keys_share_the_remote_address_quota(monkeypatch):
+    monkeypatch.setattr(flask_app.admission.config, "api_keys", frozenset({"known"}))
+    with flask_app.app.test_request_context(headers={"X-API-Key": "rotated-1"},
+                                            environ_base={"REMOTE_ADDR": "10.0.0.7"}):
+        assert flask_app.client_id() == "10.0.0.7"
+    with flask_app.app.test_request_context(headers={"X-API-Key": "known"},
+                                            environ_base={"REMOTE_ADDR": "10.0.0.7"}):
+        assert flask_app.client_id() == "known"
+
+def test_stopping_a_watch_ends_its_event_streams(client):
+    test_client, fake_llm, tmp_path = client
+    directory = str(tmp_path)
+    assert test_client.post("/watch", json={"directory": directory, "polling": True}).status_code == 200
+
+    stream = test_client.get("/events", query_string={"directory": directory}, buffered=False)
+    assert test_client.delete("/watch", json={"directory": directory}).status_code == 200
+
+    events = b"".join(stream.response).decode("utf-8")
+    assert "event: stopped" in events
+
+def test_watch_rejects_invalid_debounce(client):
+    test_client, fake_llm, tmp_path = client
+    for debounce in ("soon", -1):
+        response = test_client.post("/watch", json={"directory": str(tmp_path), "debounce": debounce})
+        assert response.status_code == 400
+
+def _indexed_docs() -> dict:
+    return {row["name"]: row["documentation"] for row in flask_app.doc_index.search(name_prefix="d")
+            + flask_app.doc_index.search(name_prefix="s")}
+
+@pytest.mark.parametrize("second_run", [{"fail": True}, {"priority": {"token_budget": 10}}])
+def test_undocumented_methods_keep_their_previous_docs(client, monkeypatch, second_run):
+    test_client, fake_llm, tmp_path = client
+    request = {"directory": str(tmp_path), "output_dir": str(tmp_path / "docs")}
+    test_client.post("/process", json=request)
+    expected = {"scale": "Documentation of scale.", "double": "Documentation of double."}
+    assert _indexed_docs() == expected
+    written = (tmp_path / "docs" / "module.py.md").read_text()
+
+    monkeypatch.setattr("cache._default_cache", TwoLevelCache())
+    fake_llm.fail = second_run.get("fail", False)
+    result = test_client.post("/process", json=dict(request, **second_run)).get_json()
+    assert result["stats"]["processed"] == 0
+
+    assert _indexed_docs() == expected
+    assert (tmp_path / "docs" / "module.py.md").read_text() == written
+
+@pytest.mark.parametrize("query_string", [{"q": "  "}, {"q": " ", "prefix": " "}])
+def test_search_rejects_blank_queries(client, query_string):
+    test_client, fake_llm, tmp_path = client
+    assert test_client.get("/search", query_string=query_string).status_code == 400
+
+def test_search_clamps_limit(client):
+    test_client, fake_llm, tmp_path = client
+    test_client.post("/process", json={"directory": str(tmp_path)})
+    assert test_client.get("/search", query_string={"q": "Documentation"}).get_json()["count"] == 2
+    response = test_client.get("/search", query_string={"q": "Documentation", "limit": -1}).get_json()
+    assert response["count"] == 1
+
+def test_stats_report_language_detection(client):
+    test_client, fake_llm, tmp_path = client
+    stats = test_client.get("/stats").get_json()
+    assert {"hits", "misses", "hit_rate"} <= set(stats["language_detection"])
@@ -0,0 +1,54 @@
+from constants import Language
+from scheduler import PriorityScheduler, SchedulerConfig, WorkItem
+from search_index import source_hash
+
+def _item(name: str, source_code: str = None, file_path: str = "/repo/app.py") -> WorkItem:
+    source_code = source_code or f"def {name}(value):\n    return value\n"
+    method = {"name": name, "source_code": source_code, "doc_comment": None, "start_line": 1, "end_line": 2}
+    return WorkItem(file_path, Language.PYTHON, method)
+
+def _order(scheduler: PriorityScheduler) -> list:
+    names = []
+    while True:
+        item = scheduler.pop()
+        if item is None:
+            return names
+        names.append(item.method["name"])
+
+def test_changed_and_public_methods_come_first():
+    unchanged = _item("stable")
+    previous = {("/repo/app.py", "stable"): {source_hash(unchanged.method["source_code"])}}
+    scheduler = PriorityScheduler(previous_hashes=previous)
+    for item in (unchanged, _item("_private_new"), _item("public_new")):
+        scheduler.push(item)
+    assert _order(scheduler) == ["public_new", "_private_new", "stable"]
+
+def test_path_patterns_and_weights():
+    config = SchedulerConfig.from_request({"path_patterns": ["*/core/*"], "weights": {"changed": 0}})
+    scheduler = PriorityScheduler(config)
+    scheduler.push(_item("helper", file_path="/repo/tools/helper.py"))
+    scheduler.push(_item("engine", file_path="/repo/core/engine.py"))
+    assert _order(scheduler) == ["engine", "helper"]
+
+def test_token_budget_sets_aside_oversized_items():
+    large = _item("large", "def large():\n" + "    x = 1\n" * 400)
+    small = _item("small")
+    budget = small.estimated_tokens + 10
+    scheduler = PriorityScheduler(SchedulerConfig(token_budget=budget, weights={"size": 1.0}))
+    scheduler.push(large)
+    scheduler.push(small)
+
+    # The larger item ranks first by size but does not fit, so the small one still runs
+    assert _order(scheduler) == ["small"]
+    assert scheduler.exhausted_reason == "token budget exhausted"
+    assert scheduler.tokens_used <= budget
+    assert [item.method["name"] for item in scheduler.drain()] == ["large"]
+    assert scheduler.drain() == []
+
+def test_time_budget_stops_dispatching():
+    scheduler = PriorityScheduler(SchedulerConfig(time_budget=0))
+    scheduler.push(_item("first"))
+    scheduler.push(_item("second"))
+    assert scheduler.pop() is None
+    assert scheduler.exhausted_reason == "time budget exhausted"
+    assert sorted(item.method["name"] for item in scheduler.drain()) == ["first", "second"]
@@ -0,0 +1,36 @@
+import pytest
+from search_index import DocIndex
+
+def _method(name: str, documentation: str, start_line: int = 1) -> dict:
+    return {"name": name, "documentation": documentation, "doc_comment": None,
+            "source_code": f"def {name}(): pass", "start_line": start_line, "end_line": start_line}
+
+@pytest.fixture
+def index(tmp_path):
+    doc_index = DocIndex(str(tmp_path / "index.sqlite3"))
+    doc_index.update_file("repo-a", "/a/cache.py", "python", [
+        _method("get_entry", "Looks up a cached entry by key."),
+        _method("evict", "Removes the least recently used entry.", 10),
+    ])
+    doc_index.update_file("repo-b", "/b/io.py", "python", [
+        _method("get_file", "Reads a file from disk."),
+    ])
+    yield doc_index
+    doc_index.close()
+
+def test_full_text_match(index):
+    assert [row["name"] for row in index.search("recently used")] == ["evict"]
+
+def test_name_prefix_range(index):
+    assert sorted(row["name"] for row in index.search(name_prefix="get_")) == ["get_entry", "get_file"]
+    assert index.search(name_prefix="zzz") == []
+
+def test_repo_filter(index):
+    assert [row["name"] for row in index.search(name_prefix="get_", repo="repo-b")] == ["get_file"]
+    assert sorted(row["name"] for row in index.search("entry", repo="repo-a")) == ["evict", "get_entry"]
+    assert index.search("disk", repo="repo-a") == []
+
+def test_replacing_a_file_drops_its_old_methods(index):
+    index.update_file("repo-a", "/a/cache.py", "python", [_method("clear", "Empties the cache.")])
+    assert index.search(name_prefix="evict") == []
+    assert [row["name"] for row in index.search("empties")] == ["clear"]
@@ -0,0 +1,44 @@
+from symbols import SymbolGraph
+
+def _method(name: str, start_line: int, class_name: str = None, body: str = "pass") -> dict:
+    return {
+        "name": name,
+        "class_name": class_name,
+        "doc_comment": None,
+        "source_code": f"def {name}(self):\n    {body}\n",
+        "start_line": start_line,
+        "end_line": start_line + 1
+    }
+
+def _graph() -> SymbolGraph:
+    return SymbolGraph.build([
+        {"file_path": "/repo/a.py", "methods": [
+            _method("save", 1),
+            _method("save", 10, class_name="Writer"),
+            _method("save", 20, class_name="Reader"),
+            _method("flush", 30, class_name="Writer", body="self.save()")
+        ]},
+        {"file_path": "/repo/b.py", "methods": [_method("save", 1), _method("close", 5)]}
+    ])
+
+def test_resolve_prefers_same_class_in_same_file():
+    symbol = _graph().resolve("save", "/repo/a.py", "Reader")
+    assert (symbol.file_path, symbol.class_name) == ("/repo/a.py", "Reader")
+
+def test_resolve_falls_back_to_same_file():
+    graph = _graph()
+    assert graph.resolve("save", "/repo/b.py", "Unknown").file_path == "/repo/b.py"
+    assert graph.resolve("save", "/repo/a.py").file_path == "/repo/a.py"
+
+def test_resolve_uses_a_unique_match_elsewhere():
+    graph = _graph()
+    assert graph.resolve("close", "/repo/a.py").file_path == "/repo/b.py"
+    # Defined in several other files, so the call is ambiguous
+    assert graph.resolve("save", "/repo/c.py") is None
+    assert graph.resolve("missing", "/repo/a.py") is None
+
+def test_callees_and_caller_counts_use_resolution():
+    graph = _graph()
+    callees = graph.callees("/repo/a.py", _method("flush", 30, class_name="Writer", body="self.save()"))
+    assert [(s.name, s.class_name) for s in callees] == [("save", "Writer")]
+    assert graph.caller_counts() == {"save": 1}
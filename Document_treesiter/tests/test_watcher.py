@@ -0,0 +1,54 @@
+import pytest
+
+pytest.importorskip("tree_sitter")
+
+from cache import TwoLevelCache
+from search_index import DocIndex
+from watcher import WatchSession
+
+JAVA_SOURCE = """public class Calculator {
+    public int add(int a) {
+        return a + 1;
+    }
+
+    public int add(int a, int b) {
+        return a + b;
+    }
+
+    public void {removed}() {
+        System.out.println("bye");
+    }
+}
+"""
+
+class FakeLLM:
+    model = "fake"
+
+    def __init__(self):
+        self.documented = []
+
+    def generate_structured_documentation(self, language, methods, refine=False):
+        self.documented.extend(method["name"] for method in methods)
+        return {method["name"]: f"Documentation of {method['name']}." for method in methods}
+
+def test_renamed_methods_leave_the_index_and_overloads_stay_unchanged(tmp_path, monkeypatch):
+    monkeypatch.setattr("cache._default_cache", TwoLevelCache())
+    source = tmp_path / "Calculator.java"
+    source.write_text(JAVA_SOURCE.replace("{removed}", "gone"))
+    doc_index = DocIndex(str(tmp_path / "index.sqlite3"))
+    llm = FakeLLM()
+    session = WatchSession(str(tmp_path), llm, doc_index)
+
+    session._on_change({str(source)})
+    assert sorted(llm.documented) == ["add", "add", "gone"]
+
+    source.write_text(JAVA_SOURCE.replace("{removed}", "other"))
+    session._on_change({str(source)})
+    assert sorted(llm.documented) == ["add", "add", "gone", "other"]
+
+    assert doc_index.search(name_prefix="gone") == []
+    assert [row["name"] for row in doc_index.file_methods(str(tmp_path), str(source))] == ["add", "add", "other"]
+
+    # Nothing changed, so nothing is sent again
+    session._on_change({str(source)})
+    assert len(llm.documented) == 4
@@ -8,33 +8,39 @@ class LanguageConfig:
     name_identifier: str
     comment_identifier: str
     docstring_query: str = None
+    class_identifiers: tuple = ()
 
 LANGUAGE_CONFIGS = {
     Language.PYTHON: LanguageConfig(
         "function_definition",
         "identifier",
         "comment",
-        "(function_definition body: (block . (expression_statement (string)) @docstring))"
+        "(function_definition body: (block . (expression_statement (string)) @docstring))",
+        class_identifiers=("class_definition",)
     ),
     Language.JAVASCRIPT: LanguageConfig(
         "function_declaration",
         "identifier",
-        "comment"
+        "comment",
+        class_identifiers=("class_declaration",)
     ),
     Language.TYPESCRIPT: LanguageConfig(
         "function_declaration",
         "identifier",
-        "comment"
+        "comment",
+        class_identifiers=("class_declaration",)
     ),
     Language.JAVA: LanguageConfig(
         "method_declaration",
         "identifier",
-        "block_comment"
+        "block_comment",
+        class_identifiers=("class_declaration", "interface_declaration", "enum_declaration")
     ),
     Language.CPP: LanguageConfig(
         "function_definition",
         "function_declarator",
-        "comment"
+        "comment",
+        class_identifiers=("class_specifier", "struct_specifier")
     ),
     Language.C: LanguageConfig(
         "function_definition",
@@ -49,16 +55,19 @@ LANGUAGE_CONFIGS = {
     Language.RUST: LanguageConfig(
         "function_item",
         "identifier",
-        "line_comment"
+        "line_comment",
+        class_identifiers=("impl_item", "trait_item")
     ),
     Language.KOTLIN: LanguageConfig(
         "function_declaration",
         "simple_identifier",
-        "comment"
+        "comment",
+        class_identifiers=("class_declaration", "object_declaration")
     ),
     Language.C_SHARP: LanguageConfig(
         "method_declaration",
         "identifier",
-        "comment"
+        "comment",
+        class_identifiers=("class_declaration", "struct_declaration", "interface_declaration")
     )
 }
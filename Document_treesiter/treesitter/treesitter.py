@@ -6,12 +6,13 @@ from treesitter.language_config import LANGUAGE_CONFIGS, LanguageConfig
 
 class TreesitterMethodNode:
     def __init__(self, name: str, doc_comment: str, method_source_code: str, 
-                 start_line: int, end_line: int):
+                 start_line: int, end_line: int, class_name: Optional[str] = None):
         self.name = name
         self.doc_comment = doc_comment
         self.method_source_code = method_source_code
         self.start_line = start_line
         self.end_line = end_line
+        self.class_name = class_name
 
 class DynamicTreesitter:
     def __init__(self, language: Language):
@@ -56,7 +57,8 @@ class DynamicTreesitter:
                     doc_comment=doc_comment,
                     method_source_code=source_code,
                     start_line=node.start_point[0],
-                    end_line=node.end_point[0]
+                    end_line=node.end_point[0],
+                    class_name=self._query_enclosing_class(node)
                 ))
         return methods
 
@@ -83,6 +85,21 @@ class DynamicTreesitter:
                     return child.text.decode()
         return None
 
+    def _query_enclosing_class(self, node: tree_sitter.Node) -> Optional[str]:
+        """Extract the name of the class (or impl/trait block) enclosing a method node."""
+        parent = node.parent
+        while parent is not None:
+            if parent.type in self.config.class_identifiers:
+                name_node = parent.child_by_field_name("name") or parent.child_by_field_name("type")
+                if name_node is None:
+                    # Some grammars (e.g. Kotlin) don't expose a name field
+                    name_node = next((child for child in parent.children
+                                      if child.type in ("identifier", "type_identifier", "simple_identifier")), None)
+                if name_node is not None:
+                    return name_node.text.decode('utf-8')
+            parent = parent.parent
+        return None
+
     def _query_doc_comment(self, node: tree_sitter.Node) -> Optional[str]:
         """Extract documentation comments for a method."""
         if self._doc_query:  # Python-style docstrings
@@ -1,5 +1,4 @@
 import os
-from pathlib import Path
 from typing import Optional, Dict, List, Tuple
 from tree_sitter import Parser
 from typing import Dict
@@ -25,6 +24,9 @@ except ImportError:
 
 from constants import Language as LangEnum
 from treesitter import create_treesitter
+from treesitter.language_config import LANGUAGE_CONFIGS
+from cache import get_cache, content_key
+from language_detection import detect_language, language_for_extension, get_file_extension
 
 class LanguageHandler:
     _instance = None
@@ -82,39 +84,7 @@ class LanguageHandler:
 
 def get_programming_language(file_extension: str) -> LangEnum:
     """Returns the programming language based on file extension."""
-    language_mapping = {
-        ".py": LangEnum.PYTHON,
-        ".js": LangEnum.JAVASCRIPT,
-        ".jsx": LangEnum.JAVASCRIPT,
-        ".ts": LangEnum.TYPESCRIPT,
-        ".tsx": LangEnum.TYPESCRIPT,
-        ".java": LangEnum.JAVA,
-        ".cpp": LangEnum.CPP,
-        ".hpp": LangEnum.CPP,
-        ".c": LangEnum.C,
-        ".h": LangEnum.C,
-        ".html": LangEnum.HTML,
-        ".htm": LangEnum.HTML,
-        ".css": LangEnum.CSS,
-        ".php": LangEnum.PHP,
-        ".rb": LangEnum.RUBY,
-        ".go": LangEnum.GO,
-        ".rs": LangEnum.RUST,
-        ".swift": LangEnum.SWIFT,
-        ".kt": LangEnum.KOTLIN,
-        ".cs": LangEnum.C_SHARP,
-        ".m": LangEnum.OBJECTIVE_C,
-        ".mm": LangEnum.OBJECTIVE_C,
-        ".scala": LangEnum.SCALA,
-        ".pl": LangEnum.PERL,
-        ".lua": LangEnum.LUA,
-        ".r": LangEnum.R
-    }
-    return language_mapping.get(file_extension.lower(), LangEnum.UNKNOWN)
-
-def get_file_extension(file_path: str) -> str:
-    """Returns the file extension from a path."""
-    return Path(file_path).suffix.lower()
+    return language_for_extension(file_extension)
 
 def process_file_content(file_path: str, parser: TreeParser) -> Tuple[Optional[List[dict]], Optional[str]]:
     if not TREE_SITTER_AVAILABLE:
@@ -124,7 +94,7 @@ def process_file_content(file_path: str, parser: TreeParser) -> Tuple[Optional[L
         with open(file_path, 'rb') as f:
             content = f.read()
         
-        language = get_programming_language(get_file_extension(file_path))
+        language = detect_language(file_path, content)
         treesitter = create_treesitter(language)
         parsed_methods = treesitter.parse(content)
         
@@ -150,8 +120,8 @@ def process_repository(directory_path: str, language: LangEnum) -> dict:
     
     for root, _, files in os.walk(directory_path):
         for file in files:
-            if get_programming_language(get_file_extension(file)) == language:
-                file_path = os.path.join(root, file)
+            file_path = os.path.join(root, file)
+            if detect_language(file_path) == language:
                 parsed_methods, error = process_file_content(file_path, parser)
                 
                 if error:
@@ -163,16 +133,71 @@ def process_repository(directory_path: str, language: LangEnum) -> dict:
                     
                 result["files"].append({
                     "file_path": file_path,
-                    "methods": [
-                        {
-                            "name": method.name,
-                            "doc_comment": method.doc_comment,
-                            "source_code": method.method_source_code,
-                            "start_line": method.start_line,
-                            "end_line": method.end_line
-                        }
-                        for method in parsed_methods
-                    ] if parsed_methods else []
+                    "methods": method_dicts(parsed_methods)
                 })
     
-    return result
\ No newline at end of file
+    return result
+
+# Bump whenever the extractor or the shape of method_dicts changes, so cached
+# parse results from older deployments are not served with missing fields
+PARSE_CACHE_VERSION = 2
+
+def method_dicts(parsed_methods: Optional[List]) -> List[dict]:
+    """Converts parsed TreesitterMethodNodes into plain dictionaries."""
+    return [
+        {
+            "name": method.name,
+            "doc_comment": method.doc_comment,
+            "source_code": method.method_source_code,
+            "start_line": method.start_line,
+            "end_line": method.end_line,
+            "class_name": method.class_name
+        }
+        for method in parsed_methods
+    ] if parsed_methods else []
+
+def parse_methods(content: bytes, language: LangEnum) -> List[dict]:
+    """Parses source content into method dictionaries, reusing cached results for identical content."""
+    cache = get_cache()
+    key = content_key("parse", PARSE_CACHE_VERSION, language.value, content)
+    methods = cache.get(key)
+    if methods is None:
+        methods = method_dicts(create_treesitter(language).parse(content))
+        cache.set(key, methods)
+    return methods
+
+def extract_file(file_path: str) -> Optional[dict]:
+    """Extracts the methods of one source file, or returns None if its language is unsupported."""
+    language = detect_language(file_path)
+    if language not in LANGUAGE_CONFIGS:
+        return None
+
+    parser = LanguageHandler().get_parser(language)
+    if not parser:
+        return None
+
+    file_result = {"file_path": file_path, "language": language}
+    try:
+        with open(file_path, 'rb') as f:
+            content = f.read()
+        file_result["methods"] = parse_methods(content, language)
+    except Exception as e:
+        file_result["error"] = f"Error processing file: {str(e)}"
+    return file_result
+
+def extract_repository(directory_path: str) -> dict:
+    """Walks a directory once and extracts the methods of every supported source file."""
+    if not TREE_SITTER_AVAILABLE:
+        return {"error": "tree-sitter is not installed. Please install with: pip install tree-sitter tree-sitter-languages"}
+
+    if not os.path.exists(directory_path):
+        return {"error": f"Directory not found: {directory_path}"}
+
+    result = {"files": []}
+    for root, _, files in os.walk(directory_path):
+        for file in files:
+            file_result = extract_file(os.path.join(root, file))
+            if file_result is not None:
+                result["files"].append(file_result)
+
+    return result
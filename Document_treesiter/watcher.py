@@ -0,0 +1,256 @@
+import os
+import json
+import time
+import queue
+import threading
+from typing import Optional, Callable, Dict, Set, Tuple
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+    WATCHDOG_AVAILABLE = False
+
+from llm import LLM
+from search_index import DocIndex, source_hash
+from scheduler import PriorityScheduler
+from symbols import SymbolGraph
+from runner import DocumentationRun
+from utils import extract_file
+
+class EventBroadcaster:
+    """Fans events out to any number of subscriber queues."""
+
+    def __init__(self, max_queue_size: int = 100):
+        self.max_queue_size = max_queue_size
+        self._subscribers: Set[queue.Queue] = set()
+        self._lock = threading.Lock()
+        self._final_event: Optional[dict] = None
+
+    def subscribe(self) -> queue.Queue:
+        subscriber = queue.Queue(maxsize=self.max_queue_size)
+        with self._lock:
+            if self._final_event is not None:
+                # Late subscribers of a closed broadcaster end right away
+                subscriber.put_nowait(self._final_event)
+                return subscriber
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: queue.Queue):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event: dict):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            # A slow subscriber loses its oldest events rather than blocking the watcher
+            while True:
+                try:
+                    subscriber.put_nowait(event)
+                    break
+                except queue.Full:
+                    try:
+                        subscriber.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    def close(self, event: dict):
+        """Publishes a final event; subscribers should stop reading once they receive it."""
+        with self._lock:
+            self._final_event = dict(event, final=True)
+        self.publish(self._final_event)
+
+def is_final_event(event: dict) -> bool:
+    return bool(event.get("final"))
+
+def format_sse(event: dict) -> str:
+    """Formats an event as a server-sent events message."""
+    return f"event: {event.get('type', 'message')}\ndata: {json.dumps(event)}\n\n"
+
+class _ChangeHandler(FileSystemEventHandler):
+    def __init__(self, on_path: Callable[[str], None]):
+        self.on_path = on_path
+
+    def on_any_event(self, event):
+        if event.is_directory:
+            return
+        self.on_path(event.src_path)
+        dest_path = getattr(event, "dest_path", None)
+        if dest_path:
+            self.on_path(dest_path)
+
+class DirectoryWatcher:
+    """Watches a directory and reports bursts of changed paths after a quiet period.
+
+    Uses inotify (through watchdog) when it is installed and falls back to
+    polling file modification times otherwise. Changes are coalesced until no
+    new change arrives for `debounce` seconds, or at most `max_delay` seconds.
+    """
+
+    def __init__(self, directory: str, on_change: Callable[[Set[str]], None], debounce: float = 0.5,
+                 max_delay: float = 5.0, poll_interval: float = 1.0, use_polling: bool = False):
+        self.directory = os.path.abspath(directory)
+        self.on_change = on_change
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        self.mode = "polling" if use_polling or not WATCHDOG_AVAILABLE else "inotify"
+
+        self._pending: Set[str] = set()
+        self._first_change: Optional[float] = None
+        self._last_change: Optional[float] = None
+        self._condition = threading.Condition()
+        self._stopped = threading.Event()
+        self._observer = None
+        self._threads = []
+
+    def _record(self, path: str):
+        with self._condition:
+            now = time.monotonic()
+            if not self._pending:
+                self._first_change = now
+            self._pending.add(os.path.abspath(path))
+            self._last_change = now
+            self._condition.notify()
+
+    def _snapshot(self) -> Dict[str, Tuple[float, int]]:
+        snapshot = {}
+        for root, _, files in os.walk(self.directory):
+            for file in files:
+                file_path = os.path.join(root, file)
+                try:
+                    stat = os.stat(file_path)
+                except OSError:
+                    continue
+                snapshot[file_path] = (stat.st_mtime, stat.st_size)
+        return snapshot
+
+    def _poll(self):
+        previous = self._snapshot()
+        while not self._stopped.wait(self.poll_interval):
+            current = self._snapshot()
+            for file_path in set(previous) | set(current):
+                if previous.get(file_path) != current.get(file_path):
+                    self._record(file_path)
+            previous = current
+
+    def _dispatch(self):
+        while not self._stopped.is_set():
+            with self._condition:
+                if not self._pending:
+                    self._condition.wait(timeout=0.5)
+                    continue
+                now = time.monotonic()
+                quiet_for = now - self._last_change
+                waiting_for = now - self._first_change
+                if quiet_for < self.debounce and waiting_for < self.max_delay:
+                    self._condition.wait(timeout=min(self.debounce - quiet_for, self.max_delay - waiting_for))
+                    continue
+                paths, self._pending = self._pending, set()
+
+            try:
+                self.on_change(paths)
+            except Exception as e:
+                print(f"Error handling changes in {self.directory}: {str(e)}")
+
+    def start(self):
+        if self.mode == "inotify":
+            self._observer = Observer()
+            self._observer.schedule(_ChangeHandler(self._record), self.directory, recursive=True)
+            self._observer.start()
+        else:
+            self._threads.append(threading.Thread(target=self._poll, daemon=True))
+        self._threads.append(threading.Thread(target=self._dispatch, daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        with self._condition:
+            self._condition.notify_all()
+        if self._observer:
+            self._observer.stop()
+            self._observer.join()
+        for thread in self._threads:
+            thread.join()
+
+class WatchSession:
+    """Keeps the documentation of a watched directory current.
+
+    Changed files are re-parsed and reconciled with the index as a whole, so
+    deleted and renamed methods disappear; only methods whose source hash is
+    not indexed yet are sent to the LLM. Results are published to the
+    session's subscribers.
+    """
+
+    def __init__(self, directory: str, llm: LLM, doc_index: DocIndex, repo: Optional[str] = None,
+                 debounce: float = 0.5, use_polling: bool = False):
+        self.directory = os.path.abspath(directory)
+        self.repo = repo or self.directory
+        self.llm = llm
+        self.doc_index = doc_index
+        self.events = EventBroadcaster()
+
+        self._hashes: Dict[Tuple[str, str], Set[str]] = doc_index.source_hashes(self.repo)
+        self._files: Dict[str, dict] = {}
+        self.watcher = DirectoryWatcher(self.directory, self._on_change, debounce=debounce,
+                                        use_polling=use_polling)
+
+    def start(self):
+        self.watcher.start()
+
+    def stop(self):
+        self.watcher.stop()
+        self.events.close({"type": "stopped", "directory": self.directory})
+
+    def _on_change(self, paths: Set[str]):
+        changed_files = []
+        for file_path in sorted(paths):
+            if not os.path.isfile(file_path):
+                known = self._files.pop(file_path, None) is not None
+                if known or any(key[0] == file_path for key in self._hashes):
+                    self._hashes = {key: value for key, value in self._hashes.items() if key[0] != file_path}
+                    self.doc_index.update_file(self.repo, file_path, None, [])
+                    self.events.publish({"type": "deleted", "file_path": file_path})
+                continue
+
+            file_info = extract_file(file_path)
+            if file_info is None:
+                continue
+            if "error" in file_info:
+                self.events.publish({"type": "error", "file_path": file_path, "error": file_info["error"]})
+                continue
+
+            self._files[file_path] = file_info
+            indexed_names = {key[1] for key in self._hashes if key[0] == file_path}
+            changed = any(
+                source_hash(method.get("source_code")) not in self._hashes.get((file_path, method["name"]), ())
+                for method in file_info["methods"]
+            ) or indexed_names != {method["name"] for method in file_info["methods"]}
+            if changed:
+                changed_files.append(file_info)
+
+        if not changed_files:
+            return
+
+        # Context comes from every file seen so far in this session
+        symbol_graph = SymbolGraph.build(self._files.values())
+        # Whole files are reconciled so deleted and renamed methods leave the index;
+        # unchanged methods keep their indexed documentation without an LLM call
+        run = DocumentationRun(self.llm, self.repo, None, self.doc_index, PriorityScheduler(),
+                               symbol_graph=symbol_graph, reuse_unchanged=True)
+        result = run.run(changed_files)
+
+        for file_info, entry in zip(changed_files, result["files"]):
+            # Failed methods keep no new hash, so the next change retries them
+            file_path = file_info["file_path"]
+            self._hashes = {key: value for key, value in self._hashes.items() if key[0] != file_path}
+            for row in self.doc_index.file_methods(self.repo, file_path):
+                if row["source_hash"]:
+                    self._hashes.setdefault((file_path, row["name"]), set()).add(row["source_hash"])
+            self.events.publish(dict(entry, type="documented"))
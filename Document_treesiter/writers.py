@@ -0,0 +1,169 @@
+import os
+import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+MANIFEST_NAME = ".doce_manifest.json"
+
+class DocWriter:
+    """Renders the documentation of a single source file and the tree index."""
+    extension = ""
+    index_name = ""
+
+    def render_file(self, file_entry: dict, relative_path: str) -> str:
+        raise NotImplementedError
+
+    def render_index(self, entries: List[dict]) -> str:
+        raise NotImplementedError
+
+class MarkdownWriter(DocWriter):
+    extension = ".md"
+    index_name = "index.md"
+
+    def render_file(self, file_entry: dict, relative_path: str) -> str:
+        lines = [f"# {relative_path}", "", f"Language: `{file_entry.get('language', 'unknown')}`", ""]
+        for method in file_entry.get("methods", []):
+            lines.append(f"## `{method['name']}`")
+            lines.append("")
+            lines.append(method.get("documentation", "").strip())
+            lines.append("")
+        return "\n".join(lines)
+
+    def render_index(self, entries: List[dict]) -> str:
+        lines = ["# Documentation Index", ""]
+        for entry in entries:
+            lines.append(f"- [{entry['source']}]({entry['output']}) ({entry['methods']} methods)")
+        lines.append("")
+        return "\n".join(lines)
+
+class JsonWriter(DocWriter):
+    extension = ".json"
+    index_name = "index.json"
+
+    def render_file(self, file_entry: dict, relative_path: str) -> str:
+        return json.dumps({
+            "source": relative_path,
+            "language": file_entry.get("language"),
+            "methods": file_entry.get("methods", [])
+        }, indent=2)
+
+    def render_index(self, entries: List[dict]) -> str:
+        return json.dumps({"files": entries}, indent=2)
+
+WRITERS = {
+    "markdown": MarkdownWriter,
+    "json": JsonWriter
+}
+
+def _content_hash(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+def _write_atomic(path: str, content: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+class OutputStage:
+    """Writes documentation to disk as a tree that mirrors the source layout.
+
+    File entries are buffered and handed to a thread pool in batches, so disk
+    writes overlap with documentation generation. Files whose rendered content
+    hash matches the manifest of the previous write are left untouched.
+    """
+
+    def __init__(self, source_root: str, output_dir: str, output_format: str = "markdown",
+                 batch_size: int = 16, max_workers: int = 4):
+        writer_cls = WRITERS.get(output_format)
+        if not writer_cls:
+            raise ValueError(f"Unsupported output format: {output_format}")
+
+        self.source_root = os.path.abspath(source_root)
+        self.output_dir = os.path.abspath(output_dir)
+        self.writer = writer_cls()
+        self.batch_size = batch_size
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._futures = []
+        self._buffer: List[dict] = []
+        self._lock = threading.Lock()
+        self._stats = {"written": 0, "unchanged": 0, "failed": 0}
+        self._manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict[str, dict]:
+        """Loads the hash and index entry of every file written by earlier runs."""
+        try:
+            with open(os.path.join(self.output_dir, MANIFEST_NAME), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _output_path(self, file_path: str) -> Optional[str]:
+        relative_path = os.path.relpath(os.path.abspath(file_path), self.source_root)
+        if relative_path.startswith(os.pardir):
+            return None
+        return relative_path
+
+    def submit(self, file_entry: dict):
+        """Queues the documentation of one source file for writing."""
+        with self._lock:
+            self._buffer.append(file_entry)
+            if len(self._buffer) < self.batch_size:
+                return
+            batch, self._buffer = self._buffer, []
+        self._futures.append(self._executor.submit(self._write_batch, batch))
+
+    def _write_batch(self, batch: List[dict]):
+        for file_entry in batch:
+            relative_path = self._output_path(file_entry["file_path"])
+            if relative_path is None:
+                print(f"Skipping output for file outside source root: {file_entry['file_path']}")
+                with self._lock:
+                    self._stats["failed"] += 1
+                continue
+
+            output_name = relative_path + self.writer.extension
+            try:
+                content = self.writer.render_file(file_entry, relative_path)
+                digest = _content_hash(content)
+                output_path = os.path.join(self.output_dir, output_name)
+                previous = self._manifest.get(output_name) or {}
+                unchanged = previous.get("hash") == digest and os.path.exists(output_path)
+                if not unchanged:
+                    _write_atomic(output_path, content)
+                with self._lock:
+                    self._manifest[output_name] = {
+                        "hash": digest,
+                        "source": relative_path.replace(os.sep, "/"),
+                        "output": output_name.replace(os.sep, "/"),
+                        "methods": len(file_entry.get("methods", []))
+                    }
+                    self._stats["unchanged" if unchanged else "written"] += 1
+            except Exception as e:
+                print(f"Error writing documentation for {file_entry['file_path']}: {str(e)}")
+                with self._lock:
+                    self._stats["failed"] += 1
+
+    def close(self) -> dict:
+        """Flushes pending writes, writes the index and returns write statistics."""
+        with self._lock:
+            batch, self._buffer = self._buffer, []
+        if batch:
+            self._futures.append(self._executor.submit(self._write_batch, batch))
+        for future in self._futures:
+            future.result()
+        self._executor.shutdown()
+
+        # Files documented by earlier runs stay in the index as long as their output exists
+        entries = [
+            {key: value for key, value in entry.items() if key != "hash"}
+            for name, entry in sorted(self._manifest.items())
+            if isinstance(entry, dict) and os.path.exists(os.path.join(self.output_dir, name))
+        ]
+        _write_atomic(os.path.join(self.output_dir, self.writer.index_name), self.writer.render_index(entries))
+        _write_atomic(os.path.join(self.output_dir, MANIFEST_NAME), json.dumps(self._manifest, indent=2))
+
+        return dict(self._stats, output_dir=self.output_dir)